@@ -0,0 +1,91 @@
+"""Check that a late game in steady state doesn't keep allocating memory
+and count garbage collections it triggers.
+
+Garbage density and the rate of shots are kept high, so the game runs
+at a steady number of entities. After warm-up, memory traced with
+tracemalloc is sampled every window of ticks, the check fails if
+it grows by more than MAX_GROWTH_PER_TICK bytes per tick.
+
+Usage: python allocation_check.py --ticks 2000"""
+import argparse
+import gc
+import sys
+import tracemalloc
+
+from constants import GUN_AVAILABLE_YEAR
+from controls import InputState
+from game import Game, freeze_startup_objects
+from headless import HeadlessCanvas, parse_size
+
+WARM_UP_TICKS = 500
+WINDOW_TICKS = 250
+MAX_GROWTH_PER_TICK = 64
+# every SHOT_PERIOD-th tick a shot is fired from a random column
+SHOT_PERIOD = 2
+
+
+def count_collections() -> list[int]:
+    return [generation['collections'] for generation in gc.get_stats()]
+
+
+def run_check(ticks: int, rows: int, columns: int, seed: int) -> bool:
+    game = Game(seed)
+    # late game: dense garbage and the gun
+    game.year = GUN_AVAILABLE_YEAR
+    canvas = HeadlessCanvas(rows, columns)
+    compositor = game.start(canvas, InputState(source=canvas))
+    freeze_startup_objects()
+
+    def run_ticks(number: int) -> None:
+        for _ in range(number):
+            if game.scheduler.tick % SHOT_PERIOD == 0:
+                column = game.random.randint(1, columns - 2)
+                game.projectiles.fire(rows - 2, column)
+            game.scheduler.run_tick()
+            compositor.flush()
+
+    run_ticks(WARM_UP_TICKS)
+
+    tracemalloc.start()
+    collections_before = count_collections()
+    samples = [tracemalloc.get_traced_memory()[0]]
+    for _ in range(ticks // WINDOW_TICKS):
+        run_ticks(WINDOW_TICKS)
+        samples.append(tracemalloc.get_traced_memory()[0])
+    tracemalloc.stop()
+    collections = [
+        after - before
+        for before, after in zip(collections_before, count_collections())
+    ]
+
+    growths = [
+        (after - before) / WINDOW_TICKS for before, after in zip(samples, samples[1:])
+    ]
+    # the first window may still fill free lists and caches
+    growth = sum(growths[1:]) / max(len(growths) - 1, 1)
+    entities = ', '.join(
+        f'{name} {count}' for name, count in game.count_entities().items()
+    )
+    print(f'ticks:           {len(growths) * WINDOW_TICKS}')
+    print(f'entities:        {entities}')
+    windows = ' '.join(
+        str(after - before) for before, after in zip(samples, samples[1:])
+    )
+    print(f'bytes/window:    {windows}')
+    print(f'growth:          {growth:.1f} bytes/tick')
+    print(f'gc collections:  {" / ".join(map(str, collections))} (gen 0 / 1 / 2)')
+    return growth <= MAX_GROWTH_PER_TICK
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Steady state allocation check.')
+    parser.add_argument('--ticks', type=int, default=2000, help='ticks measured')
+    parser.add_argument('--size', type=parse_size, default='50x200')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rows, columns = args.size
+    if not run_check(args.ticks, rows, columns, args.seed):
+        print(f'FAIL: memory grows by more than {MAX_GROWTH_PER_TICK} bytes/tick')
+        sys.exit(1)
+    print('OK')
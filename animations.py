@@ -1,30 +1,35 @@
 import itertools
-import os.path
-from os import listdir
 from typing import Iterable
 
-from constants import GARBAGE_DIR
+from assets import get_bundle
+from sprites import Sprite
 
 
-def load_spaceship_frames() -> Iterable[str]:
-    spaceship_frame_files = [
-        'animations/rocket_frame_1.txt',
-        'animations/rocket_frame_2.txt',
-    ]
+def load_spaceship_frames() -> Iterable[Sprite]:
     frames = []
-    for path in spaceship_frame_files:
-        with open(path) as f:
-            spaceship_frame = f.read()
-            frames.extend([spaceship_frame, spaceship_frame])
+    for spaceship_frame in get_bundle().get_group('spaceship'):
+        frames.extend([spaceship_frame, spaceship_frame])
     return itertools.cycle(frames)
 
 
-def load_garbage_frames() -> list[str]:
-    garbage_frame_files = [os.path.join(GARBAGE_DIR, f) for f in listdir(GARBAGE_DIR)]
-    frames = []
+def load_garbage_frames() -> list[Sprite]:
+    return get_bundle().get_group('garbage')
+
+
+def load_garbage_frames_by_name() -> dict[str, Sprite]:
+    """Return garbage frames by their file names, in order of the bundle."""
+
+    bundle = get_bundle()
+    return {
+        name.removeprefix('garbage/'): bundle[name]
+        for name in bundle.names
+        if name.startswith('garbage/')
+    }
+
+
+def load_explosion_frames() -> list[Sprite]:
+    return get_bundle().get_group('explosion')
 
-    for garbage_frame_file in garbage_frame_files:
-        with open(garbage_frame_file) as f:
-            frames.append(f.read())
 
-    return frames
+def load_game_over_frame() -> Sprite:
+    return get_bundle()['game_over']
@@ -0,0 +1,213 @@
+import curses
+import os
+import select
+import sys
+import termios
+import tty
+from collections import deque
+from typing import Callable, TypeVar
+
+from constants import (
+    UP_KEY_CODE,
+    DOWN_KEY_CODE,
+    RIGHT_KEY_CODE,
+    LEFT_KEY_CODE,
+)
+
+T = TypeVar('T')
+
+# curses attribute -> SGR parameter
+SGR_PARAMETERS = {
+    curses.A_BOLD: 1,
+    curses.A_DIM: 2,
+    curses.A_UNDERLINE: 4,
+    curses.A_BLINK: 5,
+    curses.A_REVERSE: 7,
+}
+
+# escape sequences sent by arrow keys in normal and application cursor mode
+ESCAPE_KEYS = {
+    b'[A': UP_KEY_CODE,
+    b'[B': DOWN_KEY_CODE,
+    b'[C': RIGHT_KEY_CODE,
+    b'[D': LEFT_KEY_CODE,
+    b'OA': UP_KEY_CODE,
+    b'OB': DOWN_KEY_CODE,
+    b'OC': RIGHT_KEY_CODE,
+    b'OD': LEFT_KEY_CODE,
+}
+
+ENTER_SCREEN = b'\x1b[?1049h\x1b[?25l\x1b[0m\x1b[2J'
+LEAVE_SCREEN = b'\x1b[0m\x1b[?25h\x1b[?1049l'
+
+
+class AnsiScreen:
+    """Terminal screen written with ANSI escape sequences, without curses.
+
+    Supports the part of the window API the compositor and `setup_canvas`
+    use. Cursor moves, attribute changes and text of a frame are collected
+    in one preallocated buffer and sent to the terminal with a single
+    `os.write` on refresh. Cursor position and attribute left by previous
+    writes are remembered, so escape sequences are emitted only when
+    they change something, and cursor moves along a row use the shorter
+    relative form.
+
+    Number of bytes sent by the last frame is kept in `frame_bytes`,
+    totals — in `total_bytes` and `frames`."""
+
+    def __init__(
+            self,
+            rows: int,
+            columns: int,
+            output_fd: int = 1,
+            input_fd: int | None = None,
+    ) -> None:
+        self.rows = rows
+        self.columns = columns
+        self.output_fd = output_fd
+        self.input_fd = input_fd
+
+        # a frame rarely takes more than a cursor move and a symbol per cell
+        self.buffer = bytearray(rows * columns * 8)
+        self.length = 0
+        self.cursor: tuple[int, int] | None = None
+        self.attr: int | None = None
+        self._sgr_sequences: dict[int, bytes] = {}
+        self._keys: deque[int] = deque()
+
+        self.frame_bytes = 0
+        self.total_bytes = 0
+        self.frames = 0
+
+    @property
+    def bytes_per_frame(self) -> float:
+        return self.total_bytes / self.frames if self.frames else 0.0
+
+    def getmaxyx(self) -> tuple[int, int]:
+        return self.rows, self.columns
+
+    def getch(self) -> int:
+        if not self._keys and self.input_fd is not None:
+            self._read_keys()
+        if not self._keys:
+            return -1
+        return self._keys.popleft()
+
+    def addstr(
+            self, row: int, column: int, text: str, attr: int = curses.A_NORMAL,
+    ) -> None:
+        if not (0 <= row < self.rows and 0 <= column < self.columns):
+            raise curses.error('addstr() returned ERR')
+
+        while text:
+            if row >= self.rows:
+                raise curses.error('addstr() returned ERR')
+            line, text = text[:self.columns - column], text[self.columns - column:]
+            self._write(row, column, line, attr)
+            row, column = row + 1, 0
+
+    def addch(
+            self, row: int, column: int, symbol: str | int, attr: int = curses.A_NORMAL,
+    ) -> None:
+        if isinstance(symbol, int):
+            attr |= symbol & curses.A_ATTRIBUTES
+            symbol = chr(symbol & curses.A_CHARTEXT)
+        self.addstr(row, column, symbol, attr)
+
+    def border(self) -> None:
+        horizontal = '+' + '-' * (self.columns - 2) + '+'
+        self.addstr(0, 0, horizontal)
+        for row in range(1, self.rows - 1):
+            self.addstr(row, 0, '|')
+            self.addstr(row, self.columns - 1, '|')
+        self.addstr(self.rows - 1, 0, horizontal)
+
+    def refresh(self) -> None:
+        """Send collected frame to the terminal."""
+
+        frame = memoryview(self.buffer)[:self.length]
+        while frame:
+            # blocking output usually takes the whole frame at once
+            frame = frame[os.write(self.output_fd, frame):]
+
+        self.frame_bytes = self.length
+        self.total_bytes += self.length
+        self.frames += 1
+        self.length = 0
+
+    def nodelay(self, flag: bool) -> None:
+        pass
+
+    def immedok(self, flag: bool) -> None:
+        pass
+
+    def keypad(self, flag: bool) -> None:
+        pass
+
+    def _write(self, row: int, column: int, text: str, attr: int) -> None:
+        if self.cursor != (row, column):
+            self._append(self._get_cursor_move(row, column))
+        if self.attr != attr:
+            self._append(self._get_sgr_sequence(attr))
+            self.attr = attr
+        self._append(text.encode())
+
+        column += len(text)
+        # cursor stays on the last column of the row, terminals differ in
+        # where the next symbol goes, so its position is forgotten
+        self.cursor = (row, column) if column < self.columns else None
+
+    def _append(self, data: bytes) -> None:
+        end = self.length + len(data)
+        self.buffer[self.length:end] = data
+        self.length = end
+
+    def _get_cursor_move(self, row: int, column: int) -> bytes:
+        absolute = f'\x1b[{row + 1};{column + 1}H' if column else f'\x1b[{row + 1}H'
+        if self.cursor is not None and self.cursor[0] == row:
+            offset = column - self.cursor[1]
+            relative = f'\x1b[{abs(offset)}{"C" if offset > 0 else "D"}'
+            if len(relative) < len(absolute):
+                return relative.encode()
+        return absolute.encode()
+
+    def _get_sgr_sequence(self, attr: int) -> bytes:
+        if attr not in self._sgr_sequences:
+            parameters = ['0']
+            for flag, parameter in SGR_PARAMETERS.items():
+                if attr & flag:
+                    parameters.append(str(parameter))
+            self._sgr_sequences[attr] = f'\x1b[{";".join(parameters)}m'.encode()
+        return self._sgr_sequences[attr]
+
+    def _read_keys(self) -> None:
+        readable, _, _ = select.select([self.input_fd], [], [], 0)
+        if not readable:
+            return
+        data = os.read(self.input_fd, 1024)
+
+        while data:
+            if data[:1] == b'\x1b' and data[1:3] in ESCAPE_KEYS:
+                self._keys.append(ESCAPE_KEYS[data[1:3]])
+                data = data[3:]
+            else:
+                self._keys.append(data[0])
+                data = data[1:]
+
+
+def wrapper(func: Callable[..., T], *args) -> T:
+    """Run func on AnsiScreen of the whole terminal, like curses.wrapper.
+    Terminal is switched to the alternate screen and to cbreak mode,
+    and restored on exit."""
+
+    input_fd, output_fd = sys.stdin.fileno(), sys.stdout.fileno()
+    columns, rows = os.get_terminal_size(output_fd)
+    terminal_attributes = termios.tcgetattr(input_fd)
+
+    os.write(output_fd, ENTER_SCREEN)
+    try:
+        tty.setcbreak(input_fd)
+        return func(AnsiScreen(rows, columns, output_fd, input_fd), *args)
+    finally:
+        termios.tcsetattr(input_fd, termios.TCSADRAIN, terminal_attributes)
+        os.write(output_fd, LEAVE_SCREEN)
@@ -0,0 +1,283 @@
+"""Pack all game frames into one bundle file.
+
+Usage: python assets.py
+
+The game builds the bundle on start if it is missing or was built from
+other frames, so running it by hand is optional."""
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+
+from constants import ASSET_BUNDLE, GARBAGE_DIR, SPACESHIP_FRAME_FILES
+from sprites import Sprite
+
+ASSETS_DIR = os.path.dirname(os.path.abspath(__file__))
+# used if the game directory is read-only
+CACHE_DIR = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+    'async-space-game',
+)
+BUNDLE_MAGIC = b'SPGA'
+BUNDLE_VERSION = 2
+# magic, version, number of frames, SHA-256 digest of the frames
+BUNDLE_HEADER = struct.Struct('<4sBI32s')
+# name length, text offset, text length, rows, columns,
+# cells offset, number of cells, spans offset, number of spans
+INDEX_ENTRY = struct.Struct('<HIIHHIIII')
+# row, column and code point of a cell; row, column and length of a span
+CELL_FORMAT, SPAN_FORMAT = 'HHI', 'HHH'
+BUNDLE_MODE = 0o666
+
+
+def collect_frames() -> dict[str, str]:
+    """Return text of every game frame by its name in the bundle.
+    Garbage frames are named garbage/<file name>, sorted by name,
+    so their order does not depend on the file system."""
+
+    from explosion import EXPLOSION_FRAMES
+    from game_over import GAME_OVER_FRAME
+
+    frames = {}
+    for number, path in enumerate(SPACESHIP_FRAME_FILES, 1):
+        with open(os.path.join(ASSETS_DIR, path)) as f:
+            frames[f'spaceship/{number}'] = f.read()
+
+    garbage_dir = os.path.join(ASSETS_DIR, GARBAGE_DIR)
+    for file_name in sorted(os.listdir(garbage_dir)):
+        with open(os.path.join(garbage_dir, file_name)) as f:
+            frames[f'garbage/{file_name}'] = f.read()
+
+    for number, frame in enumerate(EXPLOSION_FRAMES, 1):
+        frames[f'explosion/{number}'] = frame.text
+    frames['game_over'] = GAME_OVER_FRAME
+    return frames
+
+
+def get_frames_digest(frames: dict[str, str]) -> bytes:
+    """Return digest of frame names and texts, bundle built from other
+    frames has another one."""
+
+    digest = hashlib.sha256()
+    for name, text in frames.items():
+        for part in (name, text):
+            encoded_part = part.encode()
+            digest.update(len(encoded_part).to_bytes(4, 'little'))
+            digest.update(encoded_part)
+    return digest.digest()
+
+
+def get_umask() -> int:
+    # umask can only be read by setting it
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+def encode_bundle(frames: dict[str, str]) -> bytes:
+    """Encode frames as bundle: header, index of all frames, then text,
+    cells and spans of every frame, so loading needs no parsing.
+    Offsets in the index are counted from the end of the index."""
+
+    index, data = [], bytearray()
+    for name, text in frames.items():
+        sprite = Sprite(text)
+        encoded_text = text.encode()
+        cells = [
+            value
+            for row, column, symbol in sprite.cells
+            for value in (row, column, ord(symbol))
+        ]
+        spans = [
+            value
+            for row, column, span_text in sprite.spans
+            for value in (row, column, len(span_text))
+        ]
+
+        text_offset = len(data)
+        data += encoded_text
+        cells_offset = len(data)
+        data += struct.pack(f'<{CELL_FORMAT * len(sprite.cells)}', *cells)
+        spans_offset = len(data)
+        data += struct.pack(f'<{SPAN_FORMAT * len(sprite.spans)}', *spans)
+
+        index.append((
+            name.encode(),
+            text_offset,
+            len(encoded_text),
+            sprite.rows,
+            sprite.columns,
+            cells_offset,
+            len(sprite.cells),
+            spans_offset,
+            len(sprite.spans),
+        ))
+
+    header = bytearray(BUNDLE_HEADER.pack(
+        BUNDLE_MAGIC, BUNDLE_VERSION, len(index), get_frames_digest(frames),
+    ))
+    for encoded_name, *entry in index:
+        header += INDEX_ENTRY.pack(len(encoded_name), *entry)
+        header += encoded_name
+    return bytes(header + data)
+
+
+def build_bundle(path: str, frames: dict[str, str]) -> None:
+    """Save frames to bundle file. Bundle is written to a temporary file
+    replacing the path at once, so processes loading it never see
+    a half-written one."""
+
+    bundle = encode_bundle(frames)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    descriptor, temporary_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp',
+    )
+    try:
+        # temporary files are private, the bundle is readable like any file
+        os.fchmod(descriptor, BUNDLE_MODE & ~get_umask())
+        with os.fdopen(descriptor, 'wb') as f:
+            f.write(bundle)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+
+
+class AssetBundle:
+    """Frames of a bundle, memory-mapped from a file, see `open`,
+    or kept in memory.
+
+    Only the index is read on opening, a frame is decoded to a sprite
+    on first request and kept for the next ones. `digest` is the digest
+    of frames the bundle was built from."""
+
+    def __init__(self, data: bytes | mmap.mmap, name: str = 'bundle') -> None:
+        self._data = data
+
+        if len(data) < BUNDLE_HEADER.size:
+            raise ValueError(f'{name} is not an asset bundle.')
+        magic, version, frames_number, self.digest = BUNDLE_HEADER.unpack_from(data)
+        if magic != BUNDLE_MAGIC:
+            raise ValueError(f'{name} is not an asset bundle.')
+        if version != BUNDLE_VERSION:
+            raise ValueError(
+                f'Bundle version {version} of {name} is not supported. '
+                f'Expects {BUNDLE_VERSION}, rebuild it with python assets.py.',
+            )
+
+        self._index: dict[str, tuple[int, ...]] = {}
+        offset = BUNDLE_HEADER.size
+        for _ in range(frames_number):
+            name_length, *entry = INDEX_ENTRY.unpack_from(self._data, offset)
+            offset += INDEX_ENTRY.size
+            name = self._data[offset:offset + name_length].decode()
+            offset += name_length
+            self._index[name] = tuple(entry)
+
+        self._data_offset = offset
+        self._sprites: dict[str, Sprite] = {}
+
+    @classmethod
+    def open(cls, path: str) -> 'AssetBundle':
+        with open(path, 'rb') as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), path)
+
+    @property
+    def names(self) -> list[str]:
+        return list(self._index)
+
+    def get_group(self, group: str) -> list[Sprite]:
+        """Return sprites named <group>/..., in order of the bundle."""
+
+        prefix = f'{group}/'
+        return [self[name] for name in self._index if name.startswith(prefix)]
+
+    def load_all(self) -> None:
+        """Decode every frame of the bundle now."""
+
+        for name in self._index:
+            self[name]
+
+    def __getitem__(self, name: str) -> Sprite:
+        if name not in self._sprites:
+            self._sprites[name] = self._decode(*self._index[name])
+        return self._sprites[name]
+
+    def _decode(
+            self,
+            text_offset: int,
+            text_length: int,
+            rows: int,
+            columns: int,
+            cells_offset: int,
+            cells_number: int,
+            spans_offset: int,
+            spans_number: int,
+    ) -> Sprite:
+        start = self._data_offset
+        text = self._data[start + text_offset:start + text_offset + text_length]
+        text = text.decode()
+
+        cell_values = struct.unpack_from(
+            f'<{CELL_FORMAT * cells_number}', self._data, start + cells_offset,
+        )
+        cells = [
+            (cell_values[index], cell_values[index + 1], chr(cell_values[index + 2]))
+            for index in range(0, len(cell_values), 3)
+        ]
+
+        lines = text.splitlines()
+        span_values = struct.unpack_from(
+            f'<{SPAN_FORMAT * spans_number}', self._data, start + spans_offset,
+        )
+        spans = []
+        for index in range(0, len(span_values), 3):
+            row, column, length = span_values[index:index + 3]
+            spans.append((row, column, lines[row][column:column + length]))
+
+        return Sprite.from_parts(text, rows, columns, cells, spans)
+
+
+_bundle: AssetBundle | None = None
+
+
+def get_bundle() -> AssetBundle:
+    """Return bundle of game frames. A missing bundle or one built from
+    other frames is rebuilt in the game directory, or in CACHE_DIR if
+    the game directory is read-only, or in memory if both are."""
+
+    global _bundle
+    if _bundle is None:
+        frames = collect_frames()
+        _bundle = _open_bundle(frames) or AssetBundle(encode_bundle(frames))
+    return _bundle
+
+
+def _open_bundle(frames: dict[str, str]) -> AssetBundle | None:
+    digest = get_frames_digest(frames)
+    paths = [
+        os.path.join(directory, ASSET_BUNDLE) for directory in (ASSETS_DIR, CACHE_DIR)
+    ]
+    for path in paths:
+        try:
+            bundle = AssetBundle.open(path)
+        except (OSError, ValueError):
+            continue
+        if bundle.digest == digest:
+            return bundle
+
+    for path in paths:
+        try:
+            build_bundle(path, frames)
+            return AssetBundle.open(path)
+        except OSError:
+            continue
+    return None
+
+
+if __name__ == '__main__':
+    path = os.path.join(ASSETS_DIR, ASSET_BUNDLE)
+    frames = collect_frames()
+    build_bundle(path, frames)
+    print(f'{len(frames)} frames, {os.path.getsize(path)} bytes -> {path}')
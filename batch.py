@@ -0,0 +1,166 @@
+"""Run many headless games with a scripted player across processes
+and print survival year and throughput statistics.
+
+Usage: python batch.py --games 64 --ticks 5000"""
+import argparse
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from assets import get_bundle
+from controls import InputState
+from game import Game
+from headless import HeadlessCanvas, parse_size
+
+# ticks the scripted player keeps a chosen direction
+MANEUVER_TICKS = 10
+
+
+class ScriptedController(InputState):
+    """Player steering the spaceship in random directions, changing course
+    every MANEUVER_TICKS ticks and firing whenever the gun is loaded.
+    Reads no keys, its moves are defined by the seed."""
+
+    def __init__(self, seed: int | None = None) -> None:
+        super().__init__()
+        self.random = random.Random(seed)
+        self.ticks = 0
+        self.directions = 0, 0
+
+    def read(self) -> tuple[int, int, bool]:
+        if self.ticks % MANEUVER_TICKS == 0:
+            self.directions = (
+                self.random.choice((-1, 0, 1)), self.random.choice((-1, 0, 1)),
+            )
+        self.ticks += 1
+        rows_direction, columns_direction = self.directions
+        return rows_direction, columns_direction, True
+
+
+class GameResult:
+    """Outcome of one headless game."""
+
+    def __init__(
+            self, seed: int, ticks: int, seconds: float, year: int, crashed: bool,
+    ) -> None:
+        self.seed = seed
+        self.ticks = ticks
+        self.seconds = seconds
+        self.year = year
+        self.crashed = crashed
+
+
+def run_game(seed: int, ticks: int, rows: int, columns: int) -> GameResult:
+    """Play game with the given seed until the spaceship crashes
+    or the ticks run out."""
+
+    game = Game(seed)
+    canvas = HeadlessCanvas(rows, columns)
+    canvas.border()
+    compositor = game.start(canvas, ScriptedController(seed))
+
+    started_at = time.perf_counter()
+    tick = 0
+    for tick in range(1, ticks + 1):
+        game.scheduler.run_tick()
+        compositor.flush()
+        if game.game_over_year is not None:
+            break
+    seconds = time.perf_counter() - started_at
+
+    crashed = game.game_over_year is not None
+    year = game.game_over_year if crashed else game.year
+    return GameResult(seed, tick, seconds, year, crashed)
+
+
+class BatchStats:
+    """Survival year and throughput statistics of a batch of games."""
+
+    def __init__(self, results: list[GameResult], workers: int, seconds: float) -> None:
+        self.results = results
+        self.workers = workers
+        self.seconds = seconds
+
+    @property
+    def ticks(self) -> int:
+        return sum(result.ticks for result in self.results)
+
+    def format_report(self) -> str:
+        years = [result.year for result in self.results]
+        crashes = sum(result.crashed for result in self.results)
+        game_speeds = [
+            result.ticks / result.seconds for result in self.results if result.seconds
+        ]
+        lines = [
+            f'games:          {len(self.results)}',
+            f'workers:        {self.workers}',
+            f'crashed:        {crashes}',
+            f'year mean:      {statistics.fmean(years):.1f}',
+            f'year median:    {statistics.median(years)}',
+            f'year min/max:   {min(years)} / {max(years)}',
+            f'ticks:          {self.ticks}',
+            f'wall time:      {self.seconds:.2f} s',
+            f'ticks/s:        {self.ticks / self.seconds:.1f}',
+            f'ticks/s a game: {statistics.fmean(game_speeds):.1f}',
+        ]
+        return '\n'.join(lines)
+
+
+def run_batch(
+        games: int,
+        ticks: int,
+        rows: int,
+        columns: int,
+        workers: int | None = None,
+        first_seed: int = 0,
+) -> BatchStats:
+    """Run games with seeds first_seed, first_seed + 1, ... in a process pool."""
+
+    workers = workers or os.cpu_count() or 1
+    seeds = range(first_seed, first_seed + games)
+    # build a missing or outdated bundle once, before workers start loading it
+    get_bundle()
+
+    started_at = time.perf_counter()
+    with ProcessPoolExecutor(workers) as executor:
+        results = list(executor.map(
+            run_game, seeds, repeat(ticks), repeat(rows), repeat(columns),
+        ))
+    return BatchStats(results, workers, time.perf_counter() - started_at)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Run many headless games.')
+    parser.add_argument('--games', type=int, default=16, help='number of games')
+    parser.add_argument(
+        '--ticks', type=int, default=3000, help='tick limit of every game',
+    )
+    parser.add_argument(
+        '--size',
+        type=parse_size,
+        default='50x200',
+        help='canvas size as ROWSxCOLUMNS',
+    )
+    parser.add_argument(
+        '--workers', type=int, help='number of processes, all cores if omitted',
+    )
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first game')
+    args = parser.parse_args()
+
+    if args.games < 1:
+        parser.error('--games must be at least 1')
+    if args.ticks < 1:
+        parser.error('--ticks must be at least 1')
+    if args.workers is not None and args.workers < 1:
+        parser.error('--workers must be at least 1')
+    return args
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    rows, columns = args.size
+    stats = run_batch(args.games, args.ticks, rows, columns, args.workers, args.seed)
+    print(stats.format_report())
@@ -0,0 +1,89 @@
+import curses
+
+from constants import BORDER_OFFSET
+from sprites import Frame, get_sprite
+from utils import draw_frame
+
+
+class Camera:
+    """Viewport showing a part of the world on the canvas.
+
+    Moving objects live in world coordinates, the world may be larger
+    than the canvas. Camera keeps corner of the view — `row` and `column`
+    of the world shown in the upper left corner of the canvas — inside
+    the world and follows an object, see `follow`. Frames are drawn
+    through the camera: shifted to the view and skipped at once if
+    they are outside of it."""
+
+    def __init__(
+            self, view_rows: int, view_columns: int, world_rows: int, world_columns: int,
+    ) -> None:
+        self.view_rows, self.view_columns = view_rows, view_columns
+        self.world_rows = max(world_rows, view_rows)
+        self.world_columns = max(world_columns, view_columns)
+        self.row = self.column = 0
+
+    def get_world_borders(self) -> tuple[int, int, int, int]:
+        """Returns coordinates of world borders in order:
+        row_min, row_max, col_min, col_max."""
+        return (
+            BORDER_OFFSET,
+            self.world_rows - BORDER_OFFSET,
+            BORDER_OFFSET,
+            self.world_columns - BORDER_OFFSET,
+        )
+
+    def get_view_borders(self) -> tuple[int, int, int, int]:
+        """Returns world coordinates of view borders in order:
+        row_min, row_max, col_min, col_max."""
+        return (
+            self.row + BORDER_OFFSET,
+            self.row + self.view_rows - BORDER_OFFSET,
+            self.column + BORDER_OFFSET,
+            self.column + self.view_columns - BORDER_OFFSET,
+        )
+
+    def follow(
+            self, row: int | float, column: int | float, rows: int = 1, columns: int = 1,
+    ) -> None:
+        """Center the view on an object, as far as the world allows."""
+
+        center_row = round(row + rows / 2 - self.view_rows / 2)
+        center_column = round(column + columns / 2 - self.view_columns / 2)
+        self.row = min(max(center_row, 0), self.world_rows - self.view_rows)
+        self.column = min(max(center_column, 0), self.world_columns - self.view_columns)
+
+    def is_visible(
+            self, row: int | float, column: int | float, rows: int = 1, columns: int = 1,
+    ) -> bool:
+        """Determine if a box in world coordinates is at least partly in the view."""
+
+        row, column = round(row), round(column)
+        return (
+            row + rows > self.row
+            and row < self.row + self.view_rows
+            and column + columns > self.column
+            and column < self.column + self.view_columns
+        )
+
+    def draw_frame(
+            self,
+            canvas: curses.window,
+            start_row: int | float,
+            start_column: int | float,
+            frame: Frame,
+            negative: bool = False,
+    ) -> None:
+        """Draw frame given in world coordinates on canvas showing the view,
+        frames outside of the view are not drawn at all."""
+
+        sprite = get_sprite(frame)
+        if not self.is_visible(start_row, start_column, sprite.rows, sprite.columns):
+            return
+        draw_frame(
+            canvas,
+            round(start_row) - self.row,
+            round(start_column) - self.column,
+            sprite,
+            negative,
+        )
@@ -0,0 +1,52 @@
+from typing import Iterator
+
+from obstacles import Obstacle
+
+
+class CollisionEvent:
+    """Hit of a shot, identified by its id, into an obstacle at a position."""
+    __slots__ = ('shot', 'obstacle', 'row', 'column')
+
+    def __init__(self, shot: int, obstacle: Obstacle, row: float, column: float) -> None:
+        self.shot = shot
+        self.obstacle = obstacle
+        self.row = row
+        self.column = column
+
+
+class CollisionEvents:
+    """Queue of hits happened during the current tick.
+
+    Shots record their hits, consumers — explosions, scoring — read `events`
+    after every shot has moved, then the whole queue is cleared at once.
+    `hits` counts all hits ever recorded.
+
+    Cleared events are kept in a free list and reused by the next hits."""
+
+    def __init__(self) -> None:
+        self.events: list[CollisionEvent] = []
+        self.hits = 0
+        self._free: list[CollisionEvent] = []
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def __iter__(self) -> Iterator[CollisionEvent]:
+        return iter(self.events)
+
+    def record(self, shot: int, obstacle: Obstacle, row: float, column: float) -> None:
+        if self._free:
+            event = self._free.pop()
+            event.shot, event.obstacle = shot, obstacle
+            event.row, event.column = row, column
+        else:
+            event = CollisionEvent(shot, obstacle, row, column)
+        self.events.append(event)
+        self.hits += 1
+
+    def clear(self) -> None:
+        for event in self.events:
+            # don't keep hit obstacles alive in the free list
+            event.obstacle = None
+        self._free.extend(self.events)
+        self.events.clear()
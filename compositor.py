@@ -0,0 +1,158 @@
+import curses
+from contextlib import suppress
+
+from headless import CellGrid, HeadlessCanvas
+
+TRANSPARENT = '\0'
+
+
+class Layer(HeadlessCanvas):
+    """In-memory drawing layer of a compositor.
+
+    Supports the same window API as the screen it is composed to,
+    pressed keys are read from the screen."""
+
+    def __init__(
+            self,
+            screen: curses.window,
+            rows: int,
+            columns: int,
+            grid: CellGrid,
+            begin_row: int = 0,
+            begin_column: int = 0,
+    ) -> None:
+        super().__init__(
+            rows, columns, grid=grid, begin_row=begin_row, begin_column=begin_column,
+        )
+        self.screen = screen
+
+    def getch(self) -> int:
+        return self.screen.getch()
+
+    def derwin(
+            self, rows: int, columns: int, begin_row: int, begin_column: int,
+    ) -> 'Layer':
+        if begin_row + rows > self.rows or begin_column + columns > self.columns:
+            raise curses.error('derwin() returned NULL')
+        return Layer(
+            self.screen,
+            rows,
+            columns,
+            self.grid,
+            self.begin_row + begin_row,
+            self.begin_column + begin_column,
+        )
+
+
+class Compositor:
+    """Double-buffered renderer sending only changed cells to the screen.
+
+    Persistent content — stars, year block — is drawn on `background` layer
+    and stays there until overwritten. Moving objects are drawn on
+    `foreground` layer every tick and don't need to be erased: the layer
+    is cleared after each flush. Foreground is drawn over background,
+    the result is compared with the front buffer — what is on the screen
+    already — and only the differences are written to the screen.
+
+    If `spans` is set to a list, every written run of cells is also
+    appended to it as (index of the first cell, symbols, attribute),
+    where index is row * columns + column. The owner of the list
+    clears it."""
+
+    def __init__(self, screen: curses.window) -> None:
+        self.screen = screen
+        self.rows, self.columns = screen.getmaxyx()
+
+        background_grid = CellGrid(self.rows, self.columns, track_dirty=True)
+        foreground_grid = CellGrid(
+            self.rows, self.columns, fill=TRANSPARENT, track_dirty=True,
+        )
+        self.background = Layer(screen, self.rows, self.columns, background_grid)
+        self.foreground = Layer(screen, self.rows, self.columns, foreground_grid)
+        self.front = CellGrid(self.rows, self.columns)
+
+        self._previous_foreground: set[int] = set()
+        self.spans: list[tuple[int, str, int]] | None = None
+        self.changed_cells = 0
+        self.screen_writes = 0
+
+    def flush(self) -> None:
+        """Write changed cells to the screen, refresh it and clear foreground."""
+
+        self.render()
+        self.refresh()
+
+    def render(self) -> None:
+        """Write changed cells to the screen and clear foreground.
+        Adjacent changed cells of a row with the same attribute are written
+        with one call."""
+
+        background, foreground, front = (
+            self.background.grid, self.foreground.grid, self.front,
+        )
+        indexes = foreground.dirty | background.dirty | self._previous_foreground
+
+        self.changed_cells = self.screen_writes = 0
+        span_start, span_symbols, span_attr = -1, [], 0
+        for index in sorted(indexes):
+            symbol, attr = foreground.chars[index], foreground.attrs[index]
+            if symbol == TRANSPARENT:
+                symbol, attr = background.chars[index], background.attrs[index]
+
+            if symbol == front.chars[index] and attr == front.attrs[index]:
+                continue
+
+            front.chars[index], front.attrs[index] = symbol, attr
+            self.changed_cells += 1
+
+            span_end = span_start + len(span_symbols)
+            if (
+                index == span_end
+                and attr == span_attr
+                and index % self.columns != 0
+            ):
+                span_symbols.append(symbol)
+                continue
+
+            self._write_span(span_start, span_symbols, span_attr)
+            span_start, span_symbols, span_attr = index, [symbol], attr
+
+        self._write_span(span_start, span_symbols, span_attr)
+
+        self._previous_foreground = self._clear_foreground()
+        background.dirty.clear()
+
+    def _write_span(self, start: int, symbols: list[str], attr: int) -> None:
+        if not symbols:
+            return
+
+        self.screen_writes += 1
+        row, column = divmod(start, self.columns)
+        text = ''.join(symbols)
+        if self.spans is not None:
+            self.spans.append((start, text, attr))
+        if start + len(symbols) == self.rows * self.columns:
+            # Curses writes the lower right corner, but reports an error
+            with suppress(curses.error):
+                self.screen.addstr(row, column, text, attr)
+        else:
+            self.screen.addstr(row, column, text, attr)
+
+    def refresh(self) -> None:
+        self.screen.refresh()
+
+    def discard(self) -> None:
+        """Clear foreground without writing anything to the screen.
+        Used for ticks which are simulated, but not rendered."""
+
+        self._clear_foreground()
+
+    def _clear_foreground(self) -> set[int]:
+        """Make drawn foreground cells transparent, return their indexes."""
+
+        foreground = self.foreground.grid
+        for index in foreground.dirty:
+            foreground.chars[index] = TRANSPARENT
+
+        cleared, foreground.dirty = foreground.dirty, set()
+        return cleared
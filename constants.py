@@ -11,6 +11,18 @@ DOWN_KEY_CODE = 258
 YEAR_BLOCK_WIDTH = 40
 YEAR_BLOCK_HEIGHT = 6
 
+HUD_REFRESH_TICKS = 5
+
 GUN_AVAILABLE_YEAR = 2020
 
+SPACESHIP_FRAME_FILES = [
+    'animations/rocket_frame_1.txt',
+    'animations/rocket_frame_2.txt',
+]
 GARBAGE_DIR = 'animations/garbage'
+ASSET_BUNDLE = 'assets.bundle'
+
+MAX_CATCH_UP_TICKS = 5
+
+# objects out of the camera view are simulated every few ticks
+OFFSCREEN_UPDATE_PERIOD = 4
@@ -0,0 +1,88 @@
+import asyncio
+import curses
+import sys
+import time
+from typing import Callable
+
+from constants import (
+    UP_KEY_CODE,
+    DOWN_KEY_CODE,
+    RIGHT_KEY_CODE,
+    LEFT_KEY_CODE,
+    SPACE_KEY_CODE,
+)
+
+# key code -> (rows direction, columns direction), 0 keeps the axis as is
+DIRECTION_KEYS = {
+    UP_KEY_CODE: (-1, 0),
+    DOWN_KEY_CODE: (1, 0),
+    RIGHT_KEY_CODE: (0, 1),
+    LEFT_KEY_CODE: (0, -1),
+}
+
+
+class InputState:
+    """Controls state collected from keys pressed since the last read.
+
+    Keys are decoded once, when they arrive, so reading the state costs
+    the same however many keys were pressed. The last key pressed along
+    an axis sets its direction. Time of the last key press is kept
+    in `pressed_at`, by the monotonic clock.
+
+    If `source` canvas is given, its keys are polled on every read,
+    otherwise keys must be fed with `press` or `drain`, usually from
+    an event loop reader — see `watch_keyboard`."""
+
+    def __init__(
+            self,
+            source: curses.window | None = None,
+            clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.source = source
+        self.clock = clock
+
+        self.rows_direction = 0
+        self.columns_direction = 0
+        self.space_pressed = False
+        self.pressed_at: float | None = None
+
+    def press(self, key_code: int) -> None:
+        if key_code in DIRECTION_KEYS:
+            rows_direction, columns_direction = DIRECTION_KEYS[key_code]
+            self.rows_direction = rows_direction or self.rows_direction
+            self.columns_direction = columns_direction or self.columns_direction
+        elif key_code == SPACE_KEY_CODE:
+            self.space_pressed = True
+        else:
+            return
+        self.pressed_at = self.clock()
+
+    def drain(self, canvas: curses.window) -> None:
+        """Decode all keys waiting in the canvas input queue."""
+
+        while (pressed_key_code := canvas.getch()) != -1:
+            # https://docs.python.org/3/library/curses.html#curses.window.getch
+            self.press(pressed_key_code)
+
+    def read(self) -> tuple[int, int, bool]:
+        """Return controls state as (rows_direction, columns_direction,
+        space_pressed) and start collecting keys anew."""
+
+        if self.source is not None:
+            self.drain(self.source)
+
+        controls = self.rows_direction, self.columns_direction, self.space_pressed
+        self.rows_direction = self.columns_direction = 0
+        self.space_pressed = False
+        return controls
+
+
+def watch_keyboard(
+        loop: asyncio.AbstractEventLoop, canvas: curses.window, controls: InputState,
+) -> Callable[[], None]:
+    """Feed keys to controls as soon as stdin becomes readable,
+    instead of polling it every tick. Return function to stop watching."""
+
+    stdin = sys.stdin.fileno()
+    loop.add_reader(stdin, controls.drain, canvas)
+    return lambda: loop.remove_reader(stdin)
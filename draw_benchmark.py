@@ -0,0 +1,60 @@
+"""Compare the number of canvas calls needed to draw game frames
+symbol by symbol and span by span.
+
+Usage: python draw_benchmark.py"""
+import timeit
+
+from animations import load_garbage_frames, load_spaceship_frames
+from explosion import EXPLOSION_FRAMES
+from game_over import GAME_OVER_FRAME
+from headless import HeadlessCanvas
+from sprites import Sprite, get_sprite
+from utils import draw_frame
+
+CANVAS_ROWS, CANVAS_COLUMNS = 50, 200
+REPEATS = 1000
+
+
+def draw_frame_by_symbol(
+        canvas: HeadlessCanvas, start_row: int, start_column: int, sprite: Sprite,
+) -> None:
+    """Draw frame with one call per non-blank symbol, like draw_frame used to."""
+
+    for row_offset, column_offset, symbol in sprite.cells:
+        canvas.addch(start_row + row_offset, start_column + column_offset, symbol)
+
+
+def measure(draw, sprite: Sprite) -> tuple[int, float]:
+    """Return number of canvas calls per draw and microseconds per draw."""
+
+    canvas = HeadlessCanvas(CANVAS_ROWS, CANVAS_COLUMNS)
+    draw(canvas, 1, 1, sprite)
+    calls = sum(canvas.calls.values())
+
+    seconds = timeit.timeit(lambda: draw(canvas, 1, 1, sprite), number=REPEATS)
+    return calls, seconds / REPEATS * 1e6
+
+
+def main() -> None:
+    spaceship_frame = next(iter(load_spaceship_frames()))
+    frames = [
+        ('game over', get_sprite(GAME_OVER_FRAME)),
+        ('spaceship', spaceship_frame),
+    ]
+    for number, frame in enumerate(EXPLOSION_FRAMES):
+        frames.append((f'explosion {number}', frame))
+    for number, frame in enumerate(load_garbage_frames()):
+        frames.append((f'garbage {number}', frame))
+
+    print(f'{"frame":<14}{"by symbol":>12}{"by span":>10}{"us/draw":>18}')
+    for name, sprite in frames:
+        symbol_calls, symbol_time = measure(draw_frame_by_symbol, sprite)
+        span_calls, span_time = measure(draw_frame, sprite)
+        print(
+            f'{name:<14}{symbol_calls:>12}{span_calls:>10}'
+            f'{symbol_time:>10.1f} -> {span_time:<6.1f}',
+        )
+
+
+if __name__ == '__main__':
+    main()
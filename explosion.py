@@ -1,48 +1,67 @@
 import asyncio
 import curses
+from typing import TYPE_CHECKING
 
-from utils import draw_frame, get_frame_size
+from animations import load_explosion_frames
+from sprites import Sprite
+from utils import beep, draw_frame, get_frame_size
+
+if TYPE_CHECKING:
+    from camera import Camera
 
 EXPLOSION_FRAMES = [
-    """\
+    Sprite("""\
            (_)
        (  (   (  (
       () (  (  )
         ( )  ()
-    """,
-    """\
+    """),
+    Sprite("""\
            (_)
        (  (   (
          (  (  )
           )  (
-    """,
-    """\
+    """),
+    Sprite("""\
             (
           (   (
          (     (
           )  (
-    """,
-    """\
+    """),
+    Sprite("""\
             (
               (
             (
 
-    """,
+    """),
 ]
 
 
 async def explode(
-    canvas: curses.window, center_row: int | float, center_column: int | float,
+    canvas: curses.window,
+    center_row: int | float,
+    center_column: int | float,
+    short: bool = False,
+    camera: 'Camera | None' = None,
 ) -> None:
-    rows, columns = get_frame_size(EXPLOSION_FRAMES[0])
+    """Show explosion centered at the position.
+    Short explosion skips intermediate frames. If camera is given,
+    position is in world coordinates."""
+
+    explosion_frames = load_explosion_frames()
+    rows, columns = get_frame_size(explosion_frames[0])
     corner_row = center_row - rows / 2
     corner_column = center_column - columns / 2
 
-    curses.beep()
-    for frame in EXPLOSION_FRAMES:
+    if short:
+        explosion_frames = [explosion_frames[0], explosion_frames[-1]]
 
-        draw_frame(canvas, corner_row, corner_column, frame)
+    draw = camera.draw_frame if camera is not None else draw_frame
+    beep()
+    for frame in explosion_frames:
 
+        draw(canvas, corner_row, corner_column, frame)
         await asyncio.sleep(0)
-        draw_frame(canvas, corner_row, corner_column, frame, negative=True)
+
+        # keep one blank tick between explosion frames
         await asyncio.sleep(0)
@@ -0,0 +1,378 @@
+import curses
+import gc
+import random
+from typing import Iterable
+
+from animations import (
+    load_game_over_frame,
+    load_garbage_frames_by_name,
+    load_spaceship_frames,
+)
+from assets import get_bundle
+from camera import Camera
+from collisions import CollisionEvents
+from compositor import Compositor
+from constants import (
+    STAR_SYMBOLS,
+    YEAR_BLOCK_HEIGHT,
+    YEAR_BLOCK_WIDTH,
+    BORDER_OFFSET,
+    GUN_AVAILABLE_YEAR,
+    HUD_REFRESH_TICKS,
+)
+from controls import InputState
+from explosion import explode
+from game_scenario import Scenario, load_scenario
+from governor import LoadGovernor
+from physics import update_speed
+from profiler import Profiler
+from projectiles import ProjectileSystem
+from scheduler import Scheduler, sleep
+from space_garbage import GarbageSystem
+from sprites import Sprite
+from starfield import Starfield
+from utils import get_frame_size, draw_frame, get_canvas_borders
+
+COROUTINE_KINDS = {
+    'Game.show_year': 'year',
+    'Game.draw_spaceship': 'ship',
+    'Game.fill_sky_with_stars': 'star',
+    'Starfield.animate': 'star',
+    'Game.fill_orbit_with_garbage': 'garbage',
+    'Game.fire_shot_storm': 'shot',
+    'GarbageSystem.animate': 'garbage',
+    'ProjectileSystem.animate': 'shot',
+    'Game.handle_collisions': 'shot',
+    'explode': 'explosion',
+    'Game.show_performance': 'hud',
+}
+
+
+class Game:
+    """State and coroutines of one game.
+
+    Every game has its own scheduler, garbage, shots and year, so many
+    games can run in one process. All random choices are made by
+    the game's own generator, a game started with the same seed and
+    the same controls plays the same way.
+
+    If seed is not given, a random one is chosen and kept in `seed`,
+    so the game can be recorded and replayed.
+
+    Load governor lowers quality of the game — number of garbage pieces,
+    stars, explosion frames — when frames get too expensive, see
+    `LoadGovernor`. It keeps full quality unless frame costs are recorded.
+
+    The world is `world_screens` screens wide. Moving objects live in world
+    coordinates and are drawn through `camera` following the spaceship,
+    stars and year block stay on the screen.
+
+    Years, phrases and garbage spawning follow `scenario`, the default one
+    unless given, see `Scenario`.
+
+    When the spaceship collides with garbage, year of the crash is saved
+    to `game_over_year`."""
+
+    def __init__(
+        self,
+        seed: int | None = None,
+        world_screens: int = 1,
+        scenario: Scenario | None = None,
+    ) -> None:
+        self.seed = seed if seed is not None else random.randrange(2 ** 64)
+        self.random = random.Random(self.seed)
+        self.scheduler = Scheduler()
+        self.garbage = GarbageSystem()
+        self.collision_events = CollisionEvents()
+        self.projectiles = ProjectileSystem(self.garbage, self.collision_events)
+        self.world_screens = world_screens
+        self.camera: Camera | None = None
+        self.scenario = scenario if scenario is not None else load_scenario()
+        self.year = self.scenario.start_year
+        self.game_over_year: int | None = None
+
+        self.governor = LoadGovernor()
+        self.governor.on_change = self.apply_load_level
+        self.starfield: Starfield | None = None
+
+    def start(
+        self,
+        screen: curses.window,
+        controls: InputState,
+        hud: Profiler | None = None,
+    ) -> Compositor:
+        """Create compositor for the screen and start game coroutines.
+        Moving objects are drawn on compositor foreground, stars and year block
+        on its background. Spaceship is steered by controls. If hud profiler
+        is given, its performance overlay is shown in the year block."""
+
+        compositor = Compositor(screen)
+        canvas, background = compositor.foreground, compositor.background
+
+        max_height, max_width = canvas.getmaxyx()
+        self.camera = Camera(
+            max_height, max_width, max_height, max_width * self.world_screens,
+        )
+        row_center = self.camera.world_rows // 2
+        col_center = self.camera.world_columns // 2
+
+        spaceship_frames = load_spaceship_frames()
+        garbage_frames_by_name = load_garbage_frames_by_name()
+        garbage_frames = list(garbage_frames_by_name.values())
+        sprite_weights = self.scenario.get_sprite_weights(list(garbage_frames_by_name))
+
+        year_block = create_year_block(background)
+
+        spawn = self.scheduler.spawn
+        spawn(self.show_year(year_block))
+        spawn(
+            self.draw_spaceship(
+                canvas, row_center, col_center, spaceship_frames, controls,
+            ),
+        )
+        spawn(self.garbage.animate(canvas, self.camera))
+        spawn(self.projectiles.animate(canvas, self.camera))
+        spawn(self.handle_collisions(canvas))
+        spawn(self.fill_orbit_with_garbage(garbage_frames, sprite_weights))
+        spawn(self.fill_sky_with_stars(background))
+        if hud is not None:
+            spawn(self.show_performance(year_block, hud))
+        if self.scenario.has_shots:
+            spawn(self.fire_shot_storm())
+
+        return compositor
+
+    def count_entities(self) -> dict[str, int]:
+        return {
+            'garbage': len(self.garbage),
+            'shots': len(self.projectiles),
+            'hits': self.collision_events.hits,
+            'tasks': len(self.scheduler),
+            'load': self.governor.level,
+        }
+
+    def apply_load_level(self, level: int) -> None:
+        settings = self.governor.levels[level]
+        if self.starfield is not None:
+            self.starfield.set_stride(settings.star_stride)
+
+    async def handle_collisions(self, canvas: curses.window) -> None:
+        """Explode every hit of the tick, then clear the hits at once.
+        Runs after the shots have moved."""
+
+        while True:
+            short_explosions = self.governor.settings.short_explosions
+            for event in self.collision_events:
+                self.scheduler.spawn(
+                    explode(
+                        canvas, event.row, event.column, short_explosions, self.camera,
+                    ),
+                )
+            self.collision_events.clear()
+            await sleep()
+
+    async def show_game_over(self, canvas: curses.window) -> None:
+        max_height, max_width = canvas.getmaxyx()
+        game_over_frame = load_game_over_frame()
+        frame_height, frame_width = get_frame_size(game_over_frame)
+        row = max_height // 2 - frame_height // 2
+        col = max_width // 2 - frame_width // 2
+        while True:
+            draw_frame(canvas, row, col, game_over_frame)
+            await sleep()
+
+    async def fill_sky_with_stars(self, canvas: curses.window) -> None:
+        starfield = Starfield(canvas)
+        for _ in range(self.random.randint(75, 150)):
+            row_min, row_max, col_min, col_max = get_canvas_borders(canvas)
+            row = self.random.randint(row_min, row_max)
+            col = self.random.randint(col_min, col_max)
+            symbol = self.random.choice(STAR_SYMBOLS)
+            initial_blink_delay = self.random.randint(0, 30)
+
+            starfield.add_star(row, col, symbol, initial_blink_delay)
+
+        self.starfield = starfield
+        starfield.set_stride(self.governor.settings.star_stride)
+        self.scheduler.spawn(starfield.animate())
+
+    async def draw_spaceship(
+        self,
+        canvas: curses.window,
+        row_start: int,
+        col_start: int,
+        spaceship_frames: Iterable[Sprite],
+        controls: InputState,
+    ) -> None:
+        row_speed, col_speed = 0, 0
+        await self.animate_spaceship(
+            canvas, row_start, col_start, row_speed, col_speed, spaceship_frames,
+            controls,
+        )
+
+    async def animate_spaceship(
+        self,
+        canvas: curses.window,
+        row: int | float,
+        col: int | float,
+        row_speed: int | float,
+        col_speed: int | float,
+        spaceship_frames: Iterable[Sprite],
+        controls: InputState,
+    ) -> None:
+        row_min, row_max, col_min, col_max = self.camera.get_world_borders()
+        for starship_frame in spaceship_frames:
+
+            frame_row, frame_col = get_frame_size(starship_frame)
+            if self.garbage.find_collision(
+                round(row), round(col), frame_row, frame_col, starship_frame.masks,
+            ) is not None:
+                self.game_over_year = self.year
+                await self.show_game_over(canvas)
+                return
+
+            rows_dir, cols_dir, space_pressed = controls.read()
+
+            row_speed, col_speed = update_speed(
+                row_speed, col_speed, rows_dir, cols_dir,
+            )
+            row, col = row + row_speed, col + col_speed
+
+            row = min(max(row, row_min), row_max - frame_row)
+            col = min(max(col, col_min), col_max - frame_col)
+
+            if space_pressed and self.year >= GUN_AVAILABLE_YEAR:
+                self.projectiles.fire(row, col + 2)
+
+            self.camera.follow(row, col, frame_row, frame_col)
+            self.camera.draw_frame(canvas, row, col, starship_frame)
+            await sleep()
+
+    async def fill_orbit_with_garbage(
+        self,
+        garbage_frames: list[Sprite],
+        sprite_weights: dict[int, list[float]] | None = None,
+    ) -> None:
+        _, _, col_min, col_max = self.camera.get_world_borders()
+        await self.add_garbage_to_space(
+            col_min, col_max, garbage_frames, sprite_weights,
+        )
+
+    async def add_garbage_to_space(
+        self,
+        col_min: int,
+        col_max: int,
+        garbage_frames: list[Sprite],
+        sprite_weights: dict[int, list[float]] | None = None,
+    ) -> None:
+        """Add garbage as the era of the current year says. sprite_weights
+        are weights of garbage frames by the year of era."""
+
+        sprite_weights = sprite_weights or {}
+        while True:
+            era = self.scenario.get_era(self.year)
+            if era is None or era.garbage_delay_ticks is None:
+                await sleep()
+                continue
+
+            max_garbage = self.governor.settings.max_garbage
+            if max_garbage is not None and len(self.garbage) >= max_garbage:
+                await sleep()
+                continue
+
+            weights = sprite_weights.get(era.year)
+            # pieces for every screen keep garbage as dense in a wide world
+            for _ in range(era.pieces * self.world_screens):
+                col = self.random.randint(col_min, col_max)
+                if weights is None:
+                    garbage_frame = self.random.choice(garbage_frames)
+                else:
+                    [garbage_frame] = self.random.choices(garbage_frames, weights)
+                self.garbage.add(col, garbage_frame, era.get_speed(self.random))
+            await sleep(era.garbage_delay_ticks)
+
+    async def fire_shot_storm(self) -> None:
+        """Fire volleys of the era upwards from random columns
+        of the bottom row of the view."""
+
+        while True:
+            era = self.scenario.get_era(self.year)
+            _, row_max, col_min, col_max = self.camera.get_view_borders()
+            for _ in range(era.shots if era is not None else 0):
+                column = self.random.randint(col_min + 1, col_max - 1)
+                self.projectiles.fire_spread(
+                    row_max - 1, column, era.spread, -era.shot_speed, era.shot_speed,
+                )
+            await sleep()
+
+    async def show_year(self, year_block: curses.window) -> None:
+        while True:
+            year_block.addstr(
+                BORDER_OFFSET,
+                YEAR_BLOCK_WIDTH - len(str(self.year)) - BORDER_OFFSET,
+                str(self.year),
+                curses.A_BOLD,
+            )
+            if (phrase := self.scenario.phrases.get(self.year)) is not None:
+                draw_frame(
+                    year_block,
+                    BORDER_OFFSET * 2,
+                    YEAR_BLOCK_WIDTH - len(phrase) - BORDER_OFFSET,
+                    phrase,
+                )
+            await sleep(self.scenario.year_ticks)
+            if phrase is not None:
+                draw_frame(
+                    year_block,
+                    BORDER_OFFSET * 2,
+                    YEAR_BLOCK_WIDTH - len(phrase) - BORDER_OFFSET,
+                    phrase,
+                    negative=True,
+                )
+            self.year += 1
+
+    async def show_performance(
+        self, year_block: curses.window, profiler: Profiler,
+    ) -> None:
+        """Display FPS, p99 frame time and load level of the governor,
+        and entity counts on the next row, below the year."""
+
+        width = YEAR_BLOCK_WIDTH - 2 * BORDER_OFFSET
+        while True:
+            fps = profiler.get_fps()
+            p99_frame_time = profiler.get_p99_frame_time() * 1000
+            counts = self.count_entities()
+            # the level goes on the short row, entity counts may fill theirs
+            load = counts.pop('load')
+            entities = ' '.join(f'{name} {count}' for name, count in counts.items())
+            lines = [f'fps {fps:.1f} p99 {p99_frame_time:.2f} ms load {load}', entities]
+            for row, line in enumerate(lines, BORDER_OFFSET * 3):
+                year_block.addstr(row, BORDER_OFFSET, line[:width].rjust(width))
+            await sleep(HUD_REFRESH_TICKS)
+
+
+def freeze_startup_objects() -> None:
+    """Decode every frame, then move all objects allocated so far to the
+    permanent generation. Called once the game is started, so garbage
+    collections during the game don't walk frames and game state again."""
+
+    get_bundle().load_all()
+    gc.collect()
+    gc.freeze()
+
+
+def create_year_block(canvas: curses.window) -> curses.window:
+    max_height, max_width = canvas.getmaxyx()
+
+    year_block = canvas.derwin(
+        YEAR_BLOCK_HEIGHT,
+        YEAR_BLOCK_WIDTH,
+        BORDER_OFFSET,
+        max_width - YEAR_BLOCK_WIDTH - 2 * BORDER_OFFSET,
+    )
+
+    year_block.immedok(True)
+    year_block.nodelay(True)
+    year_block.refresh()
+
+    return year_block
@@ -0,0 +1,91 @@
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+from constants import MAX_CATCH_UP_TICKS, TIC_TIMEOUT
+
+
+class FixedTimestepLoop:
+    """Game loop running ticks at a fixed rate by a monotonic clock.
+
+    Every frame simulates the due tick, renders it and sleeps only for
+    the rest of the tick budget. If the loop falls behind, overdue ticks
+    are simulated without rendering — up to max_catch_up_ticks per frame,
+    ticks above that are dropped — so the game keeps wall-clock pace
+    under load instead of slowing down.
+
+    The loop sleeps by awaiting, so other event loop callbacks —
+    keyboard input in the first place — run while it waits for the next tick.
+
+    Counters:
+        overruns — frames finished after their tick deadline
+        skipped_renders — catch-up ticks simulated without rendering
+        dropped_ticks — overdue ticks not simulated at all"""
+
+    def __init__(
+            self,
+            simulate: Callable[[], None],
+            render: Callable[[], None],
+            discard: Callable[[], None],
+            timeout: float = TIC_TIMEOUT,
+            max_catch_up_ticks: int = MAX_CATCH_UP_TICKS,
+            clock: Callable[[], float] = time.monotonic,
+            sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        self.simulate = simulate
+        self.render = render
+        self.discard = discard
+        self.timeout = timeout
+        self.max_catch_up_ticks = max_catch_up_ticks
+        self.clock = clock
+        self.sleep = sleep
+
+        self.next_tick_at: float | None = None
+        self.frames = 0
+        self.overruns = 0
+        self.skipped_renders = 0
+        self.dropped_ticks = 0
+
+    async def run(self, frames: int | None = None) -> None:
+        """Run given number of frames, run forever if frames is None."""
+
+        while frames is None or frames > 0:
+            await self.run_frame()
+            if frames is not None:
+                frames -= 1
+
+    async def run_frame(self) -> None:
+        if self.next_tick_at is None:
+            self.next_tick_at = self.clock()
+
+        overdue_ticks = self._count_overdue_ticks()
+        if overdue_ticks > self.max_catch_up_ticks:
+            dropped_ticks = overdue_ticks - self.max_catch_up_ticks
+            self.dropped_ticks += dropped_ticks
+            self.next_tick_at += dropped_ticks * self.timeout
+            overdue_ticks = self.max_catch_up_ticks
+
+        for _ in range(overdue_ticks):
+            self.simulate()
+            self.discard()
+            self.next_tick_at += self.timeout
+            self.skipped_renders += 1
+
+        self.simulate()
+        self.render()
+        self.next_tick_at += self.timeout
+        self.frames += 1
+
+        delay = self.next_tick_at - self.clock()
+        if delay > 0:
+            await self.sleep(delay)
+        else:
+            self.overruns += 1
+
+    def _count_overdue_ticks(self) -> int:
+        """Count ticks which should have been run before the current one."""
+
+        lag = self.clock() - self.next_tick_at
+        if lag < self.timeout:
+            return 0
+        return int(lag // self.timeout)
@@ -1,27 +1,177 @@
-PHRASES = {
-    1957: "First Sputnik",
-    1961: "Gagarin flew!",
-    1969: "Armstrong got on the moon!",
-    1971: "First orbital space station Salute-1",
-    1981: "Flight of the Shuttle Columbia",
-    1998: 'ISS start building',
-    2011: 'Messenger launch to Mercury',
-    2020: "Take the plasma gun! Shoot the garbage!",
-}
-
-
-def get_garbage_delay_tics(year: int) -> int | None:
-    if year < 1961:
-        return None
-    elif year < 1969:
-        return 20
-    elif year < 1981:
-        return 14
-    elif year < 1995:
-        return 10
-    elif year < 2010:
-        return 8
-    elif year < 2020:
-        return 6
-    else:
-        return 2
+import bisect
+import json
+import os
+import random
+from typing import Any
+
+SCENARIOS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scenarios')
+DEFAULT_SCENARIO = 'default'
+DEFAULT_GARBAGE_SPEED = 0.5
+DEFAULT_SHOT_SPEED = 0.3
+START_YEAR = 1957
+YEAR_TICKS = 15
+
+
+class Era:
+    """Garbage and shots spawned from a year on.
+
+    Every garbage_delay_ticks ticks `pieces` pieces of garbage are added,
+    none if the delay is None. Speed of a piece is uniformly distributed
+    between the bounds of `speed`. Frames of garbage are chosen with
+    sprite_weights by garbage file name, evenly if there are no weights.
+    Every tick `shots` volleys are fired upwards from random columns
+    of the bottom row. A volley is a fan of `spread` shots flying
+    `shot_speed` cells per tick, see ProjectileSystem.fire_spread."""
+
+    def __init__(
+            self,
+            year: int,
+            garbage_delay_ticks: int | None = None,
+            pieces: int = 1,
+            speed: tuple[float, float] = (DEFAULT_GARBAGE_SPEED, DEFAULT_GARBAGE_SPEED),
+            sprite_weights: dict[str, float] | None = None,
+            shots: int = 0,
+            spread: int = 1,
+            shot_speed: float = DEFAULT_SHOT_SPEED,
+    ) -> None:
+        if garbage_delay_ticks is not None and garbage_delay_ticks < 1:
+            raise ValueError(
+                f'Garbage delay of the era {year} must be at least 1 tick or null.',
+            )
+        if pieces < 0 or shots < 0:
+            raise ValueError(f'Pieces and shots of the era {year} can\'t be negative.')
+        if spread < 1 or shot_speed <= 0:
+            raise ValueError(
+                f'Volleys of the era {year} must have at least 1 shot '
+                f'and positive speed.',
+            )
+        low, high = speed
+        if not 0 < low <= high:
+            raise ValueError(
+                f'Speed of the era {year} must be positive bounds [low, high].',
+            )
+        if sprite_weights is not None and (
+            any(weight < 0 for weight in sprite_weights.values())
+            or not any(weight > 0 for weight in sprite_weights.values())
+        ):
+            raise ValueError(
+                f'Sprite weights of the era {year} must be non-negative, '
+                f'at least one above zero.',
+            )
+
+        self.year = year
+        self.garbage_delay_ticks = garbage_delay_ticks
+        self.pieces = pieces
+        self.speed = tuple(speed)
+        self.sprite_weights = sprite_weights
+        self.shots = shots
+        self.spread = spread
+        self.shot_speed = shot_speed
+
+    def get_sprite_weights(self, names: list[str]) -> list[float]:
+        """Return weights of garbage frames with the names, in the same order."""
+
+        unknown = set(self.sprite_weights or {}) - set(names)
+        if unknown:
+            raise ValueError(
+                f'No garbage frames {", ".join(sorted(unknown))} in the era {self.year}.',
+            )
+        return [(self.sprite_weights or {}).get(name, 0) for name in names]
+
+    def get_speed(self, generator: random.Random) -> float:
+        """Return speed of a new piece, the generator is used only
+        if the speed varies."""
+
+        low, high = self.speed
+        return low if low == high else generator.uniform(low, high)
+
+
+class Scenario:
+    """Timeline of a game: year of the start, ticks per year, phrases
+    shown in the year block and eras of garbage spawning.
+
+    An era lasts from its year until the year of the next one, there is
+    no garbage before the first era. Era of a year is found with bisect."""
+
+    def __init__(
+            self,
+            name: str,
+            eras: list[Era],
+            phrases: dict[int, str] | None = None,
+            start_year: int = START_YEAR,
+            year_ticks: int = YEAR_TICKS,
+            description: str = '',
+    ) -> None:
+        years = [era.year for era in eras]
+        if years != sorted(set(years)):
+            raise ValueError(f'Eras of scenario {name!r} must go in order of years.')
+        if year_ticks < 1:
+            raise ValueError(f'Year of scenario {name!r} must last at least 1 tick.')
+
+        self.name = name
+        self.eras = eras
+        self.phrases = phrases or {}
+        self.start_year = start_year
+        self.year_ticks = year_ticks
+        self.description = description
+        self._years = years
+
+    @classmethod
+    def from_dict(cls, name: str, data: dict[str, Any]) -> 'Scenario':
+        try:
+            eras = [Era(**era) for era in data.get('eras', [])]
+            return cls(
+                name,
+                eras,
+                {int(year): phrase for year, phrase in data.get('phrases', {}).items()},
+                data.get('start_year', START_YEAR),
+                data.get('year_ticks', YEAR_TICKS),
+                data.get('description', ''),
+            )
+        except (TypeError, ValueError) as error:
+            raise ValueError(f'Wrong scenario {name!r}: {error}') from error
+
+    def get_era(self, year: int) -> Era | None:
+        index = bisect.bisect_right(self._years, year)
+        return self.eras[index - 1] if index else None
+
+    def get_sprite_weights(self, names: list[str]) -> dict[int, list[float]]:
+        """Return weights of garbage frames with the names by year of era,
+        for eras having weights. Raise ValueError for unknown names."""
+
+        return {
+            era.year: era.get_sprite_weights(names)
+            for era in self.eras
+            if era.sprite_weights
+        }
+
+    @property
+    def has_shots(self) -> bool:
+        return any(era.shots for era in self.eras)
+
+
+def get_scenario_names() -> list[str]:
+    """Return names of built-in scenarios."""
+
+    return sorted(
+        file_name.removesuffix('.json')
+        for file_name in os.listdir(SCENARIOS_DIR)
+        if file_name.endswith('.json')
+    )
+
+
+def load_scenario(name: str = DEFAULT_SCENARIO) -> Scenario:
+    """Load built-in scenario by name or scenario file by path."""
+
+    path = name
+    if not os.path.exists(path):
+        path = os.path.join(SCENARIOS_DIR, f'{name}.json')
+    if not os.path.exists(path):
+        raise ValueError(
+            f'No scenario {name!r}. Expects a path or one of: '
+            f'{", ".join(get_scenario_names())}.',
+        )
+
+    with open(path) as f:
+        data = json.load(f)
+    return Scenario.from_dict(os.path.basename(path).removesuffix('.json'), data)
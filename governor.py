@@ -0,0 +1,121 @@
+import time
+from collections import deque
+from typing import Callable
+
+from constants import TIC_TIMEOUT
+
+# number of frames whose mean cost decides on the load level
+GOVERNOR_WINDOW = 20
+# share of the tick budget above which quality goes one level down
+DEGRADE_LOAD = 0.8
+# share of the tick budget below which quality goes one level up
+RESTORE_LOAD = 0.4
+
+
+class LoadLevel:
+    """Quality settings of a load level."""
+
+    def __init__(
+            self,
+            max_garbage: int | None = None,
+            star_stride: int = 1,
+            short_explosions: bool = False,
+            obstacles_redraw_period: int = 1,
+    ) -> None:
+        # new garbage is not added while there is max_garbage pieces
+        self.max_garbage = max_garbage
+        # only every star_stride-th star is shown
+        self.star_stride = star_stride
+        # explosions show only the first and the last frames
+        self.short_explosions = short_explosions
+        # obstacle bounding boxes are updated every obstacles_redraw_period ticks,
+        # the last ones are drawn in between
+        self.obstacles_redraw_period = obstacles_redraw_period
+
+
+# every next level sheds more load
+LOAD_LEVELS = [
+    LoadLevel(),
+    LoadLevel(max_garbage=150),
+    LoadLevel(max_garbage=150, star_stride=2),
+    LoadLevel(max_garbage=150, star_stride=2, short_explosions=True),
+    LoadLevel(
+        max_garbage=75, star_stride=4, short_explosions=True, obstacles_redraw_period=2,
+    ),
+]
+
+
+class LoadGovernor:
+    """Keeps frames within the tick budget by lowering quality under load.
+
+    Cost of every frame — simulating its ticks and rendering — is recorded.
+    When mean cost of the last `window` frames is above degrade_load share
+    of the budget, the level goes one step up and quality down. When it is
+    below restore_load share, the level goes one step down. After every
+    change a whole new window is collected before the next one, and the gap
+    between the thresholds keeps the level from flapping.
+
+    Current level is in `level`, its settings — in `settings`. on_change
+    is called with the new level after every change. Nothing changes
+    unless frame costs are recorded, see `instrument`."""
+
+    def __init__(
+            self,
+            budget: float = TIC_TIMEOUT,
+            window: int = GOVERNOR_WINDOW,
+            degrade_load: float = DEGRADE_LOAD,
+            restore_load: float = RESTORE_LOAD,
+            levels: list[LoadLevel] = LOAD_LEVELS,
+            clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self.budget = budget
+        self.degrade_load = degrade_load
+        self.restore_load = restore_load
+        self.levels = levels
+        self.clock = clock
+
+        self.level = 0
+        self.changes = 0
+        self.on_change: Callable[[int], None] | None = None
+        self._costs: deque[float] = deque(maxlen=window)
+        self._frame_cost = 0.0
+
+    @property
+    def settings(self) -> LoadLevel:
+        return self.levels[self.level]
+
+    def instrument(
+            self, simulate: Callable[[], None], render: Callable[[], None],
+    ) -> tuple[Callable[[], None], Callable[[], None]]:
+        """Return versions of loop callables recording cost of every frame."""
+
+        def measured_simulate() -> None:
+            started_at = self.clock()
+            simulate()
+            self._frame_cost += self.clock() - started_at
+
+        def measured_render() -> None:
+            started_at = self.clock()
+            render()
+            self.record(self._frame_cost + self.clock() - started_at)
+            self._frame_cost = 0.0
+
+        return measured_simulate, measured_render
+
+    def record(self, frame_cost: float) -> None:
+        self._costs.append(frame_cost)
+        if len(self._costs) < self._costs.maxlen:
+            return
+
+        load = sum(self._costs) / len(self._costs) / self.budget
+        if load > self.degrade_load and self.level < len(self.levels) - 1:
+            self._set_level(self.level + 1)
+        elif load < self.restore_load and self.level > 0:
+            self._set_level(self.level - 1)
+
+    def _set_level(self, level: int) -> None:
+        self.level = level
+        self.changes += 1
+        self._costs.clear()
+        if self.on_change is not None:
+            self.on_change(level)
@@ -0,0 +1,271 @@
+import curses
+import statistics
+import time
+from array import array
+from collections import Counter, deque
+from typing import Iterable
+
+from constants import TIC_TIMEOUT
+
+BLANK = ' '
+# number of ticks whose mean latency is compared with the tick budget
+BUDGET_WINDOW = 20
+
+
+class CellGrid:
+    """Grid of characters and attributes shared by a headless window
+    and all of its subwindows.
+
+    If track_dirty=True is specified, indexes of written cells are collected
+    in `dirty` set until somebody clears it."""
+
+    def __init__(
+            self, rows: int, columns: int, fill: str = BLANK, track_dirty: bool = False,
+    ) -> None:
+        self.rows = rows
+        self.columns = columns
+        self.chars = [fill] * (rows * columns)
+        self.attrs = array('L', bytes(rows * columns * array('L').itemsize))
+        self.dirty: set[int] | None = set() if track_dirty else None
+
+    def put(self, row: int, column: int, symbol: str, attr: int) -> None:
+        index = row * self.columns + column
+        self.chars[index] = symbol
+        self.attrs[index] = attr
+        if self.dirty is not None:
+            self.dirty.add(index)
+
+    def put_text(self, row: int, column: int, text: str, attr: int) -> None:
+        """Write text which fits in the row."""
+
+        start = row * self.columns + column
+        end = start + len(text)
+        self.chars[start:end] = text
+        self.attrs[start:end] = array('L', [attr]) * len(text)
+        if self.dirty is not None:
+            self.dirty.update(range(start, end))
+
+    def get(self, row: int, column: int) -> tuple[str, int]:
+        index = row * self.columns + column
+        return self.chars[index], self.attrs[index]
+
+    def get_lines(self) -> list[str]:
+        text = ''.join(self.chars)
+        return [
+            text[start:start + self.columns]
+            for start in range(0, len(text), self.columns)
+        ]
+
+
+class HeadlessCanvas:
+    """In-memory stand-in for curses.window.
+
+    Implements the part of the window API the game uses, so the game loop
+    can be run and measured without a TTY. Writes outside of the window
+    raise curses.error the same way curses does. Calls of drawing methods
+    are counted in `calls`."""
+
+    def __init__(
+            self,
+            rows: int,
+            columns: int,
+            keys: Iterable[int] = (),
+            grid: CellGrid | None = None,
+            begin_row: int = 0,
+            begin_column: int = 0,
+    ) -> None:
+        self.rows = rows
+        self.columns = columns
+        self.grid = grid if grid is not None else CellGrid(rows, columns)
+        self.begin_row = begin_row
+        self.begin_column = begin_column
+        self.keys = list(keys)
+        self.calls: Counter[str] = Counter()
+
+    def getmaxyx(self) -> tuple[int, int]:
+        return self.rows, self.columns
+
+    def getch(self) -> int:
+        if not self.keys:
+            return -1
+        return self.keys.pop(0)
+
+    def addch(
+            self, row: int, column: int, symbol: str | int, attr: int = curses.A_NORMAL,
+    ) -> None:
+        self.calls['addch'] += 1
+        if isinstance(symbol, int):
+            attr |= symbol & curses.A_ATTRIBUTES
+            symbol = chr(symbol & curses.A_CHARTEXT)
+        self._write(row, column, symbol, attr)
+
+    def addstr(
+            self, row: int, column: int, text: str, attr: int = curses.A_NORMAL,
+    ) -> None:
+        self.calls['addstr'] += 1
+        self._write(row, column, text, attr)
+
+    def _write(self, row: int, column: int, text: str, attr: int) -> None:
+        if not (0 <= row < self.rows and 0 <= column < self.columns):
+            raise curses.error('addstr() returned ERR')
+
+        if column + len(text) < self.columns:
+            self.grid.put_text(
+                self.begin_row + row, self.begin_column + column, text, attr,
+            )
+            return
+
+        for symbol in text:
+            if row >= self.rows:
+                raise curses.error('addstr() returned ERR')
+            self.grid.put(
+                self.begin_row + row, self.begin_column + column, symbol, attr,
+            )
+            column += 1
+            if column == self.columns:
+                row, column = row + 1, 0
+
+        # Like curses, fail when the cursor can not move past the last cell
+        if row == self.rows:
+            raise curses.error('addstr() returned ERR')
+
+    def derwin(
+            self, rows: int, columns: int, begin_row: int, begin_column: int,
+    ) -> 'HeadlessCanvas':
+        if begin_row + rows > self.rows or begin_column + columns > self.columns:
+            raise curses.error('derwin() returned NULL')
+        return HeadlessCanvas(
+            rows,
+            columns,
+            grid=self.grid,
+            begin_row=self.begin_row + begin_row,
+            begin_column=self.begin_column + begin_column,
+        )
+
+    def border(self) -> None:
+        last_row, last_column = self.rows - 1, self.columns - 1
+        for column in range(1, last_column):
+            self._put(0, column, '-')
+            self._put(last_row, column, '-')
+        for row in range(1, last_row):
+            self._put(row, 0, '|')
+            self._put(row, last_column, '|')
+        corners = [(0, 0), (0, last_column), (last_row, 0), (last_row, last_column)]
+        for row, column in corners:
+            self._put(row, column, '+')
+
+    def _put(self, row: int, column: int, symbol: str) -> None:
+        self.grid.put(self.begin_row + row, self.begin_column + column, symbol, 0)
+
+    def get_lines(self) -> list[str]:
+        lines = self.grid.get_lines()[self.begin_row:self.begin_row + self.rows]
+        return [
+            line[self.begin_column:self.begin_column + self.columns]
+            for line in lines
+        ]
+
+    def refresh(self) -> None:
+        pass
+
+    def nodelay(self, flag: bool) -> None:
+        pass
+
+    def immedok(self, flag: bool) -> None:
+        pass
+
+    def keypad(self, flag: bool) -> None:
+        pass
+
+
+def parse_size(size: str) -> tuple[int, int]:
+    """Parse terminal size given as ROWSxCOLUMNS, e.g. 50x200."""
+
+    rows, _, columns = size.lower().partition('x')
+    try:
+        rows_number, columns_number = int(rows), int(columns)
+    except ValueError:
+        raise ValueError(f'Wrong size {size!r}. Expects ROWSxCOLUMNS, e.g. 50x200.')
+
+    if rows_number <= 0 or columns_number <= 0:
+        raise ValueError(f'Wrong size {size!r}. Rows and columns must be positive.')
+
+    return rows_number, columns_number
+
+
+class TickStats:
+    """Collect per-tick latency of the game loop and live entity counts.
+
+    The first tick where mean latency of the last `window` ticks goes
+    over the budget is kept in `over_budget_tick`, with the number
+    of obstacles at that tick — where the game stops keeping up."""
+
+    def __init__(self, budget: float = TIC_TIMEOUT, window: int = BUDGET_WINDOW) -> None:
+        self.budget = budget
+        self._window: deque[float] = deque(maxlen=window)
+        self.over_budget_tick: int | None = None
+        self.over_budget_obstacles = 0
+        self.latencies: list[float] = []
+        self.started_at = time.perf_counter()
+        self.finished_at = self.started_at
+        self.coroutines = 0
+        self.obstacles = 0
+        self.spawned = 0
+        self.retired = 0
+        # set by screens which count bytes sent to the terminal
+        self.bytes_per_frame: float | None = None
+
+    def record(
+            self,
+            latency: float,
+            coroutines: int,
+            obstacles: int,
+            spawned: int = 0,
+            retired: int = 0,
+    ) -> None:
+        self.latencies.append(latency)
+        self._window.append(latency)
+        if (
+            self.over_budget_tick is None
+            and len(self._window) == self._window.maxlen
+            and sum(self._window) / len(self._window) > self.budget
+        ):
+            self.over_budget_tick = len(self.latencies)
+            self.over_budget_obstacles = obstacles
+        self.coroutines = coroutines
+        self.obstacles = obstacles
+        self.spawned += spawned
+        self.retired += retired
+        self.finished_at = time.perf_counter()
+
+    @property
+    def ticks_per_second(self) -> float:
+        elapsed = self.finished_at - self.started_at
+        return len(self.latencies) / elapsed if elapsed else 0.0
+
+    def get_percentile(self, percent: int) -> float:
+        if len(self.latencies) < 2:
+            return self.latencies[0] if self.latencies else 0.0
+        return statistics.quantiles(self.latencies, n=100)[percent - 1]
+
+    def format_report(self) -> str:
+        lines = [
+            f'ticks:       {len(self.latencies)}',
+            f'ticks/s:     {self.ticks_per_second:.1f}',
+        ]
+        for percent in (50, 90, 99):
+            latency_ms = self.get_percentile(percent) * 1000
+            lines.append(f'p{percent} tick:    {latency_ms:.3f} ms')
+        lines.extend([
+            f'coroutines:  {self.coroutines}',
+            f'obstacles:   {self.obstacles}',
+            f'spawned:     {self.spawned}',
+            f'retired:     {self.retired}',
+        ])
+        if self.over_budget_tick is not None:
+            lines.append(
+                f'over budget: tick {self.over_budget_tick}, '
+                f'{self.over_budget_obstacles} obstacles',
+            )
+        if self.bytes_per_frame is not None:
+            lines.append(f'bytes/frame: {self.bytes_per_frame:.1f}')
+        return '\n'.join(lines)
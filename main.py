@@ -1,288 +1,312 @@
+import argparse
 import asyncio
 import curses
-import itertools
-import random
+import os
 import time
 from contextlib import suppress
-from typing import Iterable
+from typing import Callable
 
-from animations import load_spaceship_frames, load_garbage_frames
-from constants import (
-    TIC_TIMEOUT,
-    STAR_SYMBOLS,
-    YEAR_BLOCK_HEIGHT,
-    YEAR_BLOCK_WIDTH,
-    BORDER_OFFSET,
-    GUN_AVAILABLE_YEAR,
-)
-from explosion import explode
-from game_over import GAME_OVER_FRAME
-from game_scenario import get_garbage_delay_tics, PHRASES
-from physics import update_speed
-from space_garbage import fly_garbage, obstacles, obstacles_in_last_collision
-from utils import get_frame_size, read_controls, draw_frame, get_canvas_borders
+import ansi
+from animations import load_garbage_frames_by_name
+from controls import InputState, watch_keyboard
+from game import COROUTINE_KINDS, Game, freeze_startup_objects
+from game_loop import FixedTimestepLoop
+from game_scenario import DEFAULT_SCENARIO, get_scenario_names, load_scenario
+from headless import HeadlessCanvas, TickStats, parse_size
+from profiler import Profiler
+from replay import InputRecorder, InputReplay, Recording
+from spectators import SpectatorServer, parse_address
 
-coroutines = []
-year = 1957
 
-
-async def sleep(counter: int = 1) -> None:
-    for _ in range(counter):
-        await asyncio.sleep(0)
-
-
-async def show_game_over(canvas: curses.window) -> None:
-    max_height, max_width = canvas.getmaxyx()
-    frame_height, frame_width = get_frame_size(GAME_OVER_FRAME)
-    row = max_height // 2 - frame_height // 2
-    col = max_width // 2 - frame_width // 2
-    while True:
-        draw_frame(canvas, row, col, GAME_OVER_FRAME)
-        await sleep()
-
-
-async def fire(
-    canvas: curses.window,
-    row_start: int | float,
-    col_start: int | float,
-    row_speed: int | float = -0.3,
-    col_speed: int | float = 0,
-) -> None:
-    """Display animation of gun shot, direction and speed can be specified."""
-
-    row, col = row_start, col_start
-
-    draw_frame(canvas, row, col, '*')
-    await sleep()
-
-    draw_frame(canvas, row, col, '0')
-    await sleep()
-
-    draw_frame(canvas, row, col, '0', negative=True)
-
-    row += row_speed
-    col += col_speed
-
-    curses.beep()
-
-    symbol = '-' if col_speed else '|'
-
-    await animate_fire(canvas, row, col, row_speed, col_speed, symbol)
-
-
-async def animate_fire(
-    canvas: curses.window,
-    row: int | float,
-    col: int | float,
-    row_speed: int | float,
-    col_speed: int | float,
-    symbol: str,
-) -> None:
-    row_min, row_max, col_min, col_max = get_canvas_borders(canvas)
-    while row_min < row < row_max and col_min < col < col_max:
-
-        for obstacle in obstacles:
-            if obstacle.has_collision(round(row), round(col)):
-                obstacles_in_last_collision.append(obstacle)
-                coroutines.append(explode(canvas, row, col))
-                return
-
-        draw_frame(canvas, row, col, symbol)
-        await asyncio.sleep(0)
-        draw_frame(canvas, row, col, symbol, negative=True)
-        row += row_speed
-        col += col_speed
+def setup_canvas(canvas: curses.window) -> None:
+    # cursor of ANSI screen is hidden without curses
+    with suppress(curses.error):
+        curses.curs_set(False)
+    canvas.border()
+    canvas.nodelay(True)
+    canvas.refresh()
 
 
-async def fill_sky_with_stars(canvas: curses.window) -> None:
-    for _ in range(random.randint(75, 150)):
-        row_min, row_max, col_min, col_max = get_canvas_borders(canvas)
-        row = random.randint(row_min, row_max)
-        col = random.randint(col_min, col_max)
-        symbol = random.choice(STAR_SYMBOLS)
-        initial_blink_delay = random.randint(0, 30)
+def record_controls(
+    controls: InputState, canvas: curses.window, recording: Recording | None,
+) -> InputState:
+    """Return controls saving their state of every tick to recording,
+    return controls as is if there is no recording."""
 
-        coroutines.append(blink(canvas, row, col, symbol, initial_blink_delay))
+    if recording is None:
+        return controls
+    recording.rows, recording.columns = canvas.getmaxyx()
+    return InputRecorder(controls, recording)
 
 
-async def blink(
-    canvas: curses.window, row: int, col: int, symbol: str, initial_blink_delay: int,
-) -> None:
-    blinking_params = [
-        (round(2 / TIC_TIMEOUT), curses.A_DIM),
-        (round(0.3 / TIC_TIMEOUT), curses.A_NORMAL),
-        (round(0.5 / TIC_TIMEOUT), curses.A_BOLD),
-        (round(0.3 / TIC_TIMEOUT), curses.A_NORMAL),
-    ]
+def broadcast_after(
+    render: Callable[[], None], spectator_server: SpectatorServer,
+) -> Callable[[], None]:
+    def render_and_broadcast() -> None:
+        render()
+        spectator_server.broadcast()
 
-    _, initial_display_option = blinking_params[0]
-    canvas.addstr(row, col, symbol, initial_display_option)
-    await sleep(initial_blink_delay)
-    await animate_blink(canvas, row, col, symbol, blinking_params)
+    return render_and_broadcast
 
 
-async def animate_blink(
+def draw(
     canvas: curses.window,
-    row: int,
-    col: int,
-    symbol: str,
-    blinking_params: list[tuple[int, int]],
+    game: Game,
+    profiler: Profiler | None = None,
+    show_hud: bool = False,
+    recording: Recording | None = None,
+    address: tuple[str, int] | None = None,
+    governed: bool = True,
 ) -> None:
-    for blink_timeout, display_option in itertools.cycle(blinking_params):
-        canvas.addstr(row, col, symbol, display_option)
-        await sleep(blink_timeout)
-
-
-async def draw_spaceship(
-    canvas: curses.window,
-    row_start: int,
-    col_start: int,
-    spaceship_frames: Iterable[str],
-) -> None:
-    row_speed, col_speed = 0, 0
-    await animate_spaceship(
-        canvas, row_start, col_start, row_speed, col_speed, spaceship_frames,
+    setup_canvas(canvas)
+    asyncio.run(
+        play(canvas, game, profiler, show_hud, recording, address, governed),
     )
 
 
-async def animate_spaceship(
+async def play(
     canvas: curses.window,
-    row: int | float,
-    col: int | float,
-    row_speed: int | float,
-    col_speed: int | float,
-    spaceship_frames: Iterable[str],
+    game: Game,
+    profiler: Profiler | None = None,
+    show_hud: bool = False,
+    recording: Recording | None = None,
+    address: tuple[str, int] | None = None,
+    governed: bool = True,
 ) -> None:
-    row_min, row_max, col_min, col_max = get_canvas_borders(canvas)
-    for starship_frame in spaceship_frames:
-
-        for obstacle in obstacles:
-            if obstacle.has_collision(round(row), round(col)):
-                await show_game_over(canvas)
-                return
-
-        frame_row, frame_col = get_frame_size(starship_frame)
-        rows_dir, cols_dir, space_pressed = read_controls(canvas)
-
-        row_speed, col_speed = update_speed(
-            row_speed, col_speed, rows_dir, cols_dir,
-        )
-        row, col = row + row_speed, col + col_speed
-
-        row = min(max(row, row_min), row_max - frame_row)
-        col = min(max(col, col_min), col_max - frame_col)
-
-        if space_pressed and year >= GUN_AVAILABLE_YEAR:
-            coroutines.append(fire(canvas, row, col + 2))
-
-        draw_frame(canvas, row, col, starship_frame)
-        await sleep()
-        draw_frame(canvas, row, col, starship_frame, negative=True)
-
-
-async def fill_orbit_with_garbage(
-    canvas: curses.window, garbage_frames: list[str],
-) -> None:
-    _, _, col_min, col_max = get_canvas_borders(canvas)
-    await add_garbage_to_space(canvas, col_min, col_max, garbage_frames)
-
-
-async def add_garbage_to_space(
-    canvas: curses.window, col_min: int, col_max: int, garbage_frames: list[str],
-) -> None:
-    while True:
-        if (garbage_delay_ticks := get_garbage_delay_tics(year)) is None:
-            await sleep()
-            continue
-
-        col = random.randint(col_min, col_max)
-        garbage_frame = random.choice(garbage_frames)
-        coroutines.append(fly_garbage(canvas, col, garbage_frame))
-        await sleep(garbage_delay_ticks)
-
-
-async def show_year(year_block: curses.window) -> None:
-    global year
-    while True:
-        year_block.addstr(
-            BORDER_OFFSET,
-            YEAR_BLOCK_WIDTH - len(str(year)) - BORDER_OFFSET,
-            str(year),
-            curses.A_BOLD,
-        )
-        if (phrase := PHRASES.get(year)) is not None:
-            draw_frame(
-                year_block,
-                BORDER_OFFSET * 2,
-                YEAR_BLOCK_WIDTH - len(phrase) - BORDER_OFFSET,
-                phrase,
-            )
-        await sleep(15)
-        if phrase is not None:
-            draw_frame(
-                year_block,
-                BORDER_OFFSET * 2,
-                YEAR_BLOCK_WIDTH - len(phrase) - BORDER_OFFSET,
-                phrase,
-                negative=True,
-            )
-        year += 1
-
-
-def setup_canvas(canvas: curses.window) -> None:
-    curses.curs_set(False)
+    """Run the game loop on the asyncio event loop, keys are decoded
+    as soon as they arrive while the loop sleeps between ticks.
+    If address is given, rendered frames are streamed to spectators
+    connected to it. If governed, quality is lowered when frames don't
+    fit in the tick budget."""
+
+    controls = InputState()
+    stop_watching_keyboard = watch_keyboard(
+        asyncio.get_running_loop(), canvas, controls,
+    )
+    compositor = game.start(
+        canvas,
+        record_controls(controls, canvas, recording),
+        profiler if show_hud else None,
+    )
+    freeze_startup_objects()
+
+    simulate, render = game.scheduler.run_tick, compositor.flush
+    sleep_ = asyncio.sleep
+    if profiler is not None:
+        simulate, render = profiler.instrument(game.scheduler, compositor)
+        sleep_ = profiler.instrument_sleep(sleep_)
+
+    if address is not None:
+        spectator_server = SpectatorServer(compositor)
+        # spectators see the border too, it is not drawn by the compositor
+        compositor.background.border()
+        await spectator_server.start(*address)
+        render = broadcast_after(render, spectator_server)
+
+    if governed:
+        simulate, render = game.governor.instrument(simulate, render)
+
+    game_loop = FixedTimestepLoop(simulate, render, compositor.discard, sleep=sleep_)
+    try:
+        await game_loop.run()
+    finally:
+        stop_watching_keyboard()
+        if address is not None:
+            await spectator_server.close()
+
+
+def run_headless(
+    game: Game,
+    ticks: int,
+    rows: int,
+    columns: int,
+    profiler: Profiler | None = None,
+    show_hud: bool = False,
+    backend: str = 'curses',
+    recording: Recording | None = None,
+    replay: Recording | None = None,
+) -> TickStats:
+    """Run the game on an in-memory canvas without sleeping between ticks.
+    With ansi backend frames are encoded as escape sequences
+    and sent to /dev/null, bytes per frame are reported.
+    If replay is given, spaceship is steered by recorded controls
+    instead of keys."""
+
+    if backend == 'ansi':
+        canvas = ansi.AnsiScreen(rows, columns, os.open(os.devnull, os.O_WRONLY))
+    else:
+        canvas = HeadlessCanvas(rows, columns)
     canvas.border()
-    canvas.nodelay(True)
-    canvas.refresh()
-
-
-def create_year_block(canvas: curses.window) -> curses.window:
-    max_height, max_width = canvas.getmaxyx()
-
-    year_block = canvas.derwin(
-        YEAR_BLOCK_HEIGHT,
-        YEAR_BLOCK_WIDTH,
-        BORDER_OFFSET,
-        max_width - YEAR_BLOCK_WIDTH - 2 * BORDER_OFFSET,
+    controls = InputReplay(replay) if replay else InputState(source=canvas)
+    compositor = game.start(
+        canvas,
+        record_controls(controls, canvas, recording),
+        profiler if show_hud else None,
     )
+    freeze_startup_objects()
+
+    simulate, render = game.scheduler.run_tick, compositor.flush
+    if profiler is not None:
+        simulate, render = profiler.instrument(game.scheduler, compositor)
+
+    stats = TickStats()
+    for _ in range(ticks):
+        tick_started_at = time.perf_counter()
+        simulate()
+        render()
+        stats.record(
+            time.perf_counter() - tick_started_at,
+            len(game.scheduler),
+            len(game.garbage),
+            game.scheduler.spawned,
+            game.scheduler.retired,
+        )
 
-    year_block.immedok(True)
-    year_block.nodelay(True)
-    year_block.refresh()
-
-    return year_block
-
-
-def draw(canvas: curses.window) -> None:
-    setup_canvas(canvas)
-
-    max_height, max_width = canvas.getmaxyx()
-    row_center = max_height // 2
-    col_center = max_width // 2
-
-    spaceship_frames = load_spaceship_frames()
-    garbage_frames = load_garbage_frames()
+    if backend == 'ansi':
+        os.close(canvas.output_fd)
+        stats.bytes_per_frame = canvas.bytes_per_frame
+    return stats
 
-    year_block = create_year_block(canvas)
 
-    coroutines.append(show_year(year_block))
-    coroutines.append(
-        draw_spaceship(canvas, row_center, col_center, spaceship_frames),
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Async space game.')
+    parser.add_argument(
+        '--headless',
+        action='store_true',
+        help='run on an in-memory canvas without delays and print tick statistics',
     )
-    coroutines.append(fill_orbit_with_garbage(canvas, garbage_frames))
-    coroutines.append(fill_sky_with_stars(canvas))
-
-    while True:
-        for coroutine in coroutines.copy():
-            try:
-                coroutine.send(None)
-            except StopIteration:
-                coroutines.remove(coroutine)
-        canvas.refresh()
-        time.sleep(TIC_TIMEOUT)
+    parser.add_argument(
+        '--ticks',
+        type=int,
+        help='number of ticks to run headless, 1000 or the whole replay by default',
+    )
+    parser.add_argument(
+        '--seed', type=int, help='seed of random generator, random if omitted',
+    )
+    parser.add_argument(
+        '--size',
+        type=parse_size,
+        default='50x200',
+        help='headless canvas size as ROWSxCOLUMNS',
+    )
+    parser.add_argument(
+        '--profile',
+        metavar='PATH',
+        help='record loop and coroutine timings, save them as Chrome trace '
+             'if PATH ends with .json, as CSV otherwise',
+    )
+    parser.add_argument(
+        '--record',
+        metavar='PATH',
+        help='save seed and controls of every tick to replay the game later',
+    )
+    parser.add_argument(
+        '--replay',
+        metavar='PATH',
+        help='replay recorded game headless, with its seed, size and controls',
+    )
+    parser.add_argument(
+        '--no-governor',
+        action='store_true',
+        help='keep full quality under load, the governor is always off '
+             'in headless mode and while recording, so replays are exact',
+    )
+    parser.add_argument(
+        '--serve',
+        metavar='HOST:PORT',
+        type=parse_address,
+        help='stream the game to spectators, watch it with viewer.py HOST:PORT',
+    )
+    parser.add_argument(
+        '--backend',
+        choices=['curses', 'ansi'],
+        default='curses',
+        help='draw with curses or with ANSI escape sequences written directly, '
+             'headless ansi backend reports bytes per frame',
+    )
+    parser.add_argument(
+        '--hud',
+        action='store_true',
+        help='show FPS, p99 frame time, load level and entity counts',
+    )
+    parser.add_argument(
+        '--scenario',
+        default=DEFAULT_SCENARIO,
+        help='years and garbage of the game, a scenario file or one of: '
+             f'{", ".join(get_scenario_names())}',
+    )
+    parser.add_argument(
+        '--world-screens',
+        type=int,
+        default=1,
+        help='width of the world in screens, the view follows the spaceship',
+    )
+    args = parser.parse_args()
+    if args.seed is not None and not 0 <= args.seed < 2 ** 64:
+        parser.error('--seed must be from 0 to 2**64 - 1')
+    if args.world_screens < 1:
+        parser.error('--world-screens must be at least 1')
+    if args.world_screens != 1 and (args.record or args.replay):
+        parser.error('recordings are made in a world of one screen')
+    if args.scenario != DEFAULT_SCENARIO and (args.record or args.replay):
+        parser.error('recordings are made with the default scenario')
+    try:
+        args.scenario = load_scenario(args.scenario)
+        args.scenario.get_sprite_weights(list(load_garbage_frames_by_name()))
+    except ValueError as error:
+        parser.error(str(error))
+    return args
 
 
 if __name__ == '__main__':
-    curses.update_lines_cols()
-    with suppress(KeyboardInterrupt):
-        curses.wrapper(draw)
+    args = parse_args()
+
+    replay = Recording.load(args.replay) if args.replay else None
+    game = Game(replay.seed if replay else args.seed, args.world_screens, args.scenario)
+    recording = Recording(game.seed, 0, 0) if args.record else None
+    profiler = None
+    if args.profile or args.hud:
+        profiler = Profiler(
+            COROUTINE_KINDS,
+            game.count_entities,
+            # the trace is made of events, CSV table — of frames
+            keep_frames=bool(args.profile) and not args.profile.endswith('.json'),
+            keep_events=bool(args.profile) and args.profile.endswith('.json'),
+        )
+
+    try:
+        if args.headless or replay:
+            rows, columns = (replay.rows, replay.columns) if replay else args.size
+            ticks = args.ticks
+            if ticks is None:
+                ticks = len(replay) if replay else 1000
+            stats = run_headless(
+                game,
+                ticks,
+                rows,
+                columns,
+                profiler,
+                args.hud,
+                args.backend,
+                recording,
+                replay,
+            )
+            print(stats.format_report())
+        else:
+            wrapper = ansi.wrapper if args.backend == 'ansi' else curses.wrapper
+            curses.update_lines_cols()
+            with suppress(KeyboardInterrupt):
+                wrapper(
+                    draw,
+                    game,
+                    profiler,
+                    args.hud,
+                    recording,
+                    args.serve,
+                    not args.no_governor and recording is None,
+                )
+    finally:
+        if args.profile:
+            profiler.export(args.profile)
+        if args.record:
+            recording.save(args.record)
@@ -1,13 +1,16 @@
 import asyncio
-from typing import Generator, TYPE_CHECKING
+from typing import Generator, Iterable, TYPE_CHECKING
 
 from utils import draw_frame
 
 if TYPE_CHECKING:
     import curses
 
+    from governor import LoadGovernor
+
 
 class Obstacle:
+    __slots__ = ('row', 'column', 'rows_size', 'columns_size', 'uid')
 
     def __init__(
             self,
@@ -15,7 +18,7 @@ class Obstacle:
             column: int,
             rows_size: int = 1,
             columns_size: int = 1,
-            uid: str | None = None,
+            uid: int | str | None = None,
     ) -> None:
         self.row = row
         self.column = column
@@ -44,10 +47,14 @@ class Obstacle:
     ) -> bool:
         """Determine if collision has occurred. Return True or False."""
         return has_collision(
-            (self.row, self.column),
-            (self.rows_size, self.columns_size),
-            (obj_corner_row, obj_corner_column),
-            (obj_size_rows, obj_size_columns),
+            self.row,
+            self.column,
+            self.rows_size,
+            self.columns_size,
+            obj_corner_row,
+            obj_corner_column,
+            obj_size_rows,
+            obj_size_columns,
         )
 
 
@@ -58,60 +65,101 @@ def _get_bounding_box_lines(rows: int, columns: int) -> Generator[str, None, Non
     yield ' ' + '-' * columns + ' '
 
 
-async def show_obstacles(canvas: 'curses.window', obstacles: list[Obstacle]) -> None:
-    """Display bounding boxes of every obstacle in a list"""
+async def show_obstacles(
+        canvas: 'curses.window',
+        obstacles: Iterable[Obstacle],
+        governor: 'LoadGovernor | None' = None,
+) -> None:
+    """Display bounding boxes of every obstacle in a list.
+    Under load governor boxes may be updated not every tick, the last
+    ones are drawn again in between, since canvas is cleared every tick."""
 
+    boxes: list[tuple[int, int, str]] = []
+    tick = 0
     while True:
-        boxes = []
-
-        for obstacle in obstacles:
-            boxes.append(obstacle.dump_bounding_box())
-
+        redraw_period = governor.settings.obstacles_redraw_period if governor else 1
+        if tick % redraw_period == 0:
+            boxes = [obstacle.dump_bounding_box() for obstacle in obstacles]
         for row, column, frame in boxes:
             draw_frame(canvas, row, column, frame)
 
         await asyncio.sleep(0)
-
-        for row, column, frame in boxes:
-            draw_frame(canvas, row, column, frame, negative=True)
-
-
-def _is_point_inside(
-        corner_row: int,
-        corner_column: int,
-        size_rows: int,
-        size_columns: int,
-        point_row: int,
-        point_row_column: int,
-) -> bool:
-    rows_flag = corner_row <= point_row < corner_row + size_rows
-    columns_flag = corner_column <= point_row_column < corner_column + size_columns
-
-    return rows_flag and columns_flag
+        tick += 1
 
 
 def has_collision(
-        obstacle_corner: tuple[int, int],
-        obstacle_size: tuple[int, int],
-        obj_corner: tuple[int, int],
-        obj_size: tuple[int, int] = (1, 1),
+        obstacle_row: int,
+        obstacle_column: int,
+        obstacle_rows: int,
+        obstacle_columns: int,
+        obj_row: int,
+        obj_column: int,
+        obj_rows: int = 1,
+        obj_columns: int = 1,
 ) -> bool:
-    """Determine if collision has occurred. Return True or False."""
-
-    opposite_obstacle_corner = (
-        obstacle_corner[0] + obstacle_size[0] - 1,
-        obstacle_corner[1] + obstacle_size[1] - 1,
-    )
+    """Determine if boxes overlap, without allocating anything."""
 
-    opposite_obj_corner = (
-        obj_corner[0] + obj_size[0] - 1,
-        obj_corner[1] + obj_size[1] - 1,
+    return (
+        obj_row < obstacle_row + obstacle_rows
+        and obstacle_row < obj_row + obj_rows
+        and obj_column < obstacle_column + obstacle_columns
+        and obstacle_column < obj_column + obj_columns
     )
 
-    return any([
-        _is_point_inside(*obstacle_corner, *obstacle_size, *obj_corner),
-        _is_point_inside(*obstacle_corner, *obstacle_size, *opposite_obj_corner),
 
-        _is_point_inside(*obj_corner, *obj_size, *obstacle_corner),
-        _is_point_inside(*obj_corner, *obj_size, *opposite_obstacle_corner),
-    ])
+def has_mask_collision(
+        obstacle_row: int,
+        obstacle_column: int,
+        obstacle_masks: list[int],
+        obj_row: int,
+        obj_column: int,
+        obj_masks: list[int],
+) -> bool:
+    """Determine if non-blank cells of obstacle and object overlap.
+    Masks are bitmasks of non-blank cells of every row, see Sprite.masks."""
+
+    shift = obj_column - obstacle_column
+    first_row = max(obstacle_row, obj_row)
+    last_row = min(obstacle_row + len(obstacle_masks), obj_row + len(obj_masks))
+    for row in range(first_row, last_row):
+        obstacle_mask = obstacle_masks[row - obstacle_row]
+        obj_mask = obj_masks[row - obj_row]
+        if shift >= 0:
+            obj_mask <<= shift
+        else:
+            obstacle_mask <<= -shift
+        if obstacle_mask & obj_mask:
+            return True
+    return False
+
+
+def get_segment_entry(
+        obstacle_corner: tuple[int, int],
+        obstacle_size: tuple[int, int],
+        segment_start: tuple[float, float],
+        segment_end: tuple[float, float],
+) -> float | None:
+    """Find where segment enters obstacle, return fraction of the segment
+    length from 0 to 1, or None if segment misses obstacle.
+
+    Obstacle covers whole terminal cells, so its box is extended by half
+    a cell — like a point rounded to the nearest cell."""
+
+    entry, exit_ = 0.0, 1.0
+    for corner, size, start, end in zip(
+        obstacle_corner, obstacle_size, segment_start, segment_end,
+    ):
+        low, high = corner - 0.5, corner + size - 0.5
+        delta = end - start
+        if delta == 0:
+            if not low <= start < high:
+                return None
+            continue
+
+        low_fraction, high_fraction = (low - start) / delta, (high - start) / delta
+        entry = max(entry, min(low_fraction, high_fraction))
+        exit_ = min(exit_, max(low_fraction, high_fraction))
+        if entry > exit_:
+            return None
+
+    return entry
@@ -1,4 +1,10 @@
 import math
+from typing import MutableSequence, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 def _limit(
@@ -93,3 +99,122 @@ def update_speed(
         )
 
     return row_speed, column_speed
+
+
+def update_speeds(
+    row_speeds: MutableSequence[float],
+    column_speeds: MutableSequence[float],
+    rows_directions: Sequence[int],
+    columns_directions: Sequence[int],
+    row_speed_limit=2,
+    column_speed_limit=2,
+    fading=0.8,
+    vectorized: bool | None = None,
+) -> None:
+    """Update speeds of many ships at once, in place.
+    Every ship gets the same speed as from `update_speed`.
+
+    Speeds and directions are given as equally long sequences, usually
+    arrays, item i of each describes ship i. Directions are validated
+    once for the whole batch.
+
+    Speeds are computed with NumPy in one pass over the batch if it is
+    installed, otherwise or if vectorized is False — in a Python loop.
+    Float speed arrays, array('d') or NumPy ones, are updated without
+    copying."""
+
+    if vectorized is None:
+        vectorized = np is not None
+    elif vectorized and np is None:
+        raise ValueError('Vectorized speed update needs NumPy installed.')
+
+    ships_number = len(row_speeds)
+    if not (
+        len(column_speeds) == len(rows_directions) == len(columns_directions)
+        == ships_number
+    ):
+        raise ValueError('Speeds and directions must have the same length.')
+
+    if fading < 0 or fading > 1:
+        raise ValueError(
+            f'Wrong columns_direction value {fading}. Expects float between 0 and 1.',
+        )
+
+    for name, directions in (
+        ('rows_direction', rows_directions), ('columns_direction', columns_directions),
+    ):
+        if wrong_directions := _get_wrong_directions(directions, vectorized):
+            raise ValueError(
+                f'Wrong {name} value {min(wrong_directions)}. Expects -1, 0 or 1.',
+            )
+
+    if not ships_number:
+        return
+    accelerate_all = _accelerate_all_vectorized if vectorized else _accelerate_all
+    accelerate_all(row_speeds, rows_directions, abs(row_speed_limit), fading)
+    accelerate_all(column_speeds, columns_directions, abs(column_speed_limit), fading)
+
+
+def _get_wrong_directions(directions: Sequence[int], vectorized: bool) -> set[int]:
+    if vectorized:
+        directions = np.asarray(directions)
+        return set(directions[(directions < -1) | (directions > 1)].tolist())
+    return set(directions) - {-1, 0, 1}
+
+
+def _accelerate_all(
+        speeds: MutableSequence[float],
+        directions: Sequence[int],
+        speed_limit: int | float,
+        fading: int | float,
+) -> None:
+    """Fade speeds and apply acceleration along one axis,
+    the same arithmetic as `_apply_acceleration` in a single loop."""
+
+    cos = math.cos
+    for index, direction in enumerate(directions):
+        speed = speeds[index] * fading
+        if direction:
+            delta = cos(speed / speed_limit) * 0.75
+            speed = speed + delta if direction > 0 else speed - delta
+            if speed < -speed_limit:
+                speed = -speed_limit
+            elif speed > speed_limit:
+                speed = speed_limit
+            if abs(speed) < 0.1:
+                speed = 0
+        speeds[index] = speed
+
+
+def _accelerate_all_vectorized(
+        speeds: MutableSequence[float],
+        directions: Sequence[int],
+        speed_limit: int | float,
+        fading: int | float,
+) -> None:
+    """Same as `_accelerate_all`, computed with NumPy for the whole axis."""
+
+    # NumPy and float arrays are updated in place, other sequences are copied
+    in_place = True
+    if isinstance(speeds, np.ndarray):
+        values = speeds
+    elif getattr(speeds, 'typecode', None) == 'd':
+        values = np.frombuffer(speeds)
+    else:
+        values, in_place = np.array(speeds, dtype=float), False
+    directions = np.asarray(directions)
+
+    faded = values * fading
+    delta = np.cos(faded / speed_limit) * 0.75
+    accelerated = np.clip(
+        np.where(directions > 0, faded + delta, faded - delta),
+        -speed_limit,
+        speed_limit,
+    )
+    accelerated = np.where(np.abs(accelerated) < 0.1, 0.0, accelerated)
+    result = np.where(directions != 0, accelerated, faded)
+
+    if in_place:
+        values[:] = result
+    else:
+        speeds[:] = result.tolist()
@@ -0,0 +1,114 @@
+"""Check that batched `update_speeds` gives exactly the same speeds
+as `update_speed` called for every ship.
+
+Random batches of speeds are updated by both functions for several ticks
+in a row, with random directions, speed limits and fading. Both paths
+of `update_speeds` are checked — the Python loop and NumPy, if it is
+installed — on speeds given as array('d'), list and NumPy array.
+The check fails on any difference.
+
+Usage: python physics_check.py --batches 2000"""
+import argparse
+import random
+import sys
+from array import array
+
+import physics
+from physics import update_speed, update_speeds
+
+BATCH_SIZE = 64
+TICKS = 10
+MAX_START_SPEED = 3
+
+
+def get_limit(generator: random.Random) -> float:
+    return generator.choice([1, 2, 3, generator.uniform(0.1, 4)])
+
+
+def make_speeds(values: list[float], container: str):
+    if container == 'numpy':
+        return physics.np.array(values)
+    return array('d', values) if container == 'array' else list(values)
+
+
+def run_check(batches: int, seed: int, vectorized: bool) -> bool:
+    generator = random.Random(seed)
+    containers = ['array', 'list'] + (['numpy'] if vectorized else [])
+    updates = mismatches = 0
+    first_mismatch = ''
+
+    for _ in range(batches):
+        row_speed_limit, column_speed_limit = get_limit(generator), get_limit(generator)
+        fading = generator.choice([0, 0.8, 1, generator.random()])
+        row_speeds = [
+            generator.uniform(-MAX_START_SPEED, MAX_START_SPEED)
+            for _ in range(BATCH_SIZE)
+        ]
+        column_speeds = [
+            generator.uniform(-MAX_START_SPEED, MAX_START_SPEED)
+            for _ in range(BATCH_SIZE)
+        ]
+        container = generator.choice(containers)
+        batch_row_speeds = make_speeds(row_speeds, container)
+        batch_column_speeds = make_speeds(column_speeds, container)
+
+        for _ in range(TICKS):
+            rows_directions = [generator.choice((-1, 0, 1)) for _ in range(BATCH_SIZE)]
+            columns_directions = [
+                generator.choice((-1, 0, 1)) for _ in range(BATCH_SIZE)
+            ]
+            update_speeds(
+                batch_row_speeds,
+                batch_column_speeds,
+                rows_directions,
+                columns_directions,
+                row_speed_limit,
+                column_speed_limit,
+                fading,
+                vectorized,
+            )
+            for ship in range(BATCH_SIZE):
+                row_speeds[ship], column_speeds[ship] = update_speed(
+                    row_speeds[ship],
+                    column_speeds[ship],
+                    rows_directions[ship],
+                    columns_directions[ship],
+                    row_speed_limit,
+                    column_speed_limit,
+                    fading,
+                )
+                expected = row_speeds[ship], column_speeds[ship]
+                got = batch_row_speeds[ship], batch_column_speeds[ship]
+                updates += 1
+                if expected != got:
+                    mismatches += 1
+                    first_mismatch = first_mismatch or (
+                        f'{got} instead of {expected} (limits {row_speed_limit}, '
+                        f'{column_speed_limit}, fading {fading}, {container})'
+                    )
+                    # keep comparing from the same speeds
+                    batch_row_speeds[ship], batch_column_speeds[ship] = expected
+
+    print(f'path:            {"numpy" if vectorized else "loop"}')
+    print(f'updates:         {updates}')
+    print(f'mismatches:      {mismatches}')
+    if first_mismatch:
+        print(f'first mismatch:  {first_mismatch}')
+    return not mismatches
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Batched speed update check.')
+    parser.add_argument(
+        '--batches', type=int, default=2000, help=f'batches of {BATCH_SIZE} ships',
+    )
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    paths = [False, True] if physics.np is not None else [False]
+    if physics.np is None:
+        print('NumPy is not installed, only the loop is checked')
+    if not all([run_check(args.batches, args.seed, vectorized) for vectorized in paths]):
+        print('FAIL: update_speeds differs from update_speed')
+        sys.exit(1)
+    print('OK')
@@ -0,0 +1,210 @@
+import csv
+import json
+import statistics
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Coroutine, Iterator, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from compositor import Compositor
+    from scheduler import Scheduler
+
+PHASES = ('simulate', 'render', 'refresh', 'sleep')
+RECENT_FRAMES = 50
+
+
+class FrameProfile:
+    """Wall time spent by one rendered frame, in seconds."""
+
+    def __init__(self, started_at: float) -> None:
+        self.started_at = started_at
+        self.phases: defaultdict[str, float] = defaultdict(float)
+        self.kinds: defaultdict[str, float] = defaultdict(float)
+        self.screen_writes = 0
+        self.entities: dict[str, int] = {}
+
+    @property
+    def busy_time(self) -> float:
+        """Time of the frame without sleeping."""
+        return sum(
+            duration for phase, duration in self.phases.items() if phase != 'sleep'
+        )
+
+
+class Profiler:
+    """Opt-in instrumentation of the game loop.
+
+    Records wall time of loop phases — simulate, render, refresh, sleep —
+    and of coroutine resumes grouped by kind, together with the number of
+    cells written to the screen and live entity counts of every frame.
+    Coroutine kind is looked up in `kinds` by coroutine qualified name.
+
+    Nothing is measured unless loop callables are wrapped with `instrument`,
+    so the game pays nothing for the profiler when it is not used.
+
+    Only RECENT_FRAMES last frames are kept in `recent_frames` for the HUD.
+    Every frame is kept in `frames` if keep_frames is set, every measured
+    span — in `events` if keep_events is set, for exporting them."""
+
+    def __init__(
+            self,
+            kinds: dict[str, str],
+            count_entities: Callable[[], dict[str, int]] = dict,
+            clock: Callable[[], float] = time.perf_counter,
+            keep_frames: bool = False,
+            keep_events: bool = False,
+    ) -> None:
+        self.kinds = kinds
+        self.count_entities = count_entities
+        self.clock = clock
+        self.keep_frames = keep_frames
+        self.keep_events = keep_events
+
+        self.started_at = clock()
+        self.recent_frames: deque[FrameProfile] = deque(maxlen=RECENT_FRAMES)
+        self.frames: list[FrameProfile] = []
+        # (name, category, start, duration) of every measured span
+        self.events: list[tuple[str, str, float, float]] = []
+        self._frame: FrameProfile | None = None
+
+    def instrument(
+            self, scheduler: 'Scheduler', compositor: 'Compositor',
+    ) -> tuple[Callable[[], None], Callable[[], None]]:
+        """Start recording coroutines of the scheduler.
+        Return measured versions of simulate and render callables for the loop."""
+
+        scheduler.profiler = self
+
+        def simulate() -> None:
+            if self._frame is None:
+                self._frame = FrameProfile(self.clock())
+            with self.measure('simulate'):
+                scheduler.run_tick()
+
+        def render() -> None:
+            with self.measure('render'):
+                compositor.render()
+            with self.measure('refresh'):
+                compositor.refresh()
+            self._finish_frame(compositor.screen_writes)
+
+        return simulate, render
+
+    def instrument_sleep(
+            self, sleep: Callable[[float], Awaitable[None]],
+    ) -> Callable[[float], Awaitable[None]]:
+        """Return measured version of sleep, its time goes to the last frame."""
+
+        async def measured_sleep(delay: float) -> None:
+            started_at = self.clock()
+            await sleep(delay)
+            duration = self.clock() - started_at
+            if self.recent_frames:
+                self.recent_frames[-1].phases['sleep'] += duration
+            if self.keep_events:
+                self.events.append(('sleep', 'phase', started_at, duration))
+
+        return measured_sleep
+
+    @contextmanager
+    def measure(self, phase: str) -> Iterator[None]:
+        started_at = self.clock()
+        try:
+            yield
+        finally:
+            duration = self.clock() - started_at
+            if self._frame is not None:
+                self._frame.phases[phase] += duration
+            if self.keep_events:
+                self.events.append((phase, 'phase', started_at, duration))
+
+    @contextmanager
+    def measure_coroutine(self, coroutine: Coroutine) -> Iterator[None]:
+        kind = self.kinds.get(coroutine.__qualname__, coroutine.__qualname__)
+        started_at = self.clock()
+        try:
+            yield
+        finally:
+            duration = self.clock() - started_at
+            if self._frame is not None:
+                self._frame.kinds[kind] += duration
+            if self.keep_events:
+                self.events.append((kind, 'coroutine', started_at, duration))
+
+    def _finish_frame(self, screen_writes: int) -> None:
+        frame = self._frame or FrameProfile(self.clock())
+        frame.screen_writes = screen_writes
+        frame.entities = self.count_entities()
+        self.recent_frames.append(frame)
+        if self.keep_frames:
+            self.frames.append(frame)
+        self._frame = None
+
+    def get_fps(self) -> float:
+        recent_frames = self.recent_frames
+        if len(recent_frames) < 2:
+            return 0.0
+        elapsed = recent_frames[-1].started_at - recent_frames[0].started_at
+        return (len(recent_frames) - 1) / elapsed if elapsed else 0.0
+
+    def get_p99_frame_time(self) -> float:
+        """Return 99th percentile of recent frame busy time in seconds."""
+
+        busy_times = [frame.busy_time for frame in self.recent_frames]
+        if len(busy_times) < 2:
+            return busy_times[0] if busy_times else 0.0
+        return statistics.quantiles(busy_times, n=100)[98]
+
+    def export(self, path: str) -> None:
+        """Save profile as Chrome trace events if path ends with .json,
+        otherwise as CSV table with a row per frame."""
+
+        if path.endswith('.json'):
+            self.export_trace(path)
+        else:
+            self.export_csv(path)
+
+    def export_trace(self, path: str) -> None:
+        """Save measured spans in Chrome trace event format,
+        open it in chrome://tracing or Perfetto."""
+
+        trace_events = [
+            {
+                'name': name,
+                'cat': category,
+                'ph': 'X',
+                'ts': (started_at - self.started_at) * 1e6,
+                'dur': duration * 1e6,
+                'pid': 0,
+                'tid': 0 if category == 'phase' else 1,
+            }
+            for name, category, started_at, duration in self.events
+        ]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': trace_events}, f)
+
+    def export_csv(self, path: str) -> None:
+        kinds = sorted({kind for frame in self.frames for kind in frame.kinds})
+        entities = sorted({name for frame in self.frames for name in frame.entities})
+
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow([
+                'frame',
+                'started_at_ms',
+                *[f'{phase}_ms' for phase in PHASES],
+                *[f'{kind}_ms' for kind in kinds],
+                'screen_writes',
+                *entities,
+            ])
+            for number, frame in enumerate(self.frames):
+                writer.writerow([
+                    number,
+                    f'{(frame.started_at - self.started_at) * 1000:.3f}',
+                    *[f'{frame.phases[phase] * 1000:.3f}' for phase in PHASES],
+                    *[f'{frame.kinds[kind] * 1000:.3f}' for kind in kinds],
+                    frame.screen_writes,
+                    *[frame.entities.get(name, 0) for name in entities],
+                ])
+
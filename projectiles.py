@@ -0,0 +1,162 @@
+import asyncio
+from array import array
+from typing import TYPE_CHECKING
+
+from collisions import CollisionEvents
+from obstacles import Obstacle
+from space_garbage import GarbageSystem
+from utils import beep
+
+if TYPE_CHECKING:
+    import curses
+
+    from camera import Camera
+
+# Every shot is shown as a muzzle flash for two ticks before it flies
+MUZZLE_FLASH_SYMBOLS = '*0'
+FLYING = len(MUZZLE_FLASH_SYMBOLS)
+
+
+class ProjectileSystem:
+    """All gun shots stored as struct of arrays and animated by a single coroutine.
+
+    Shot fired during a tick shows up on the next one. Every flying shot
+    is moved and tested for collisions with garbage in one pass, so a piece
+    hit by a shot is not hit again by the next ones. A shot flying faster
+    than a cell per tick can't jump over thin garbage: the whole segment
+    from its previous position is tested and the nearest piece on it is hit.
+    Shots leaving the camera view are retired.
+    Hit garbage is flagged and the hit is recorded to `events` with id
+    of the shot and position where it hit."""
+
+    def __init__(self, garbage: GarbageSystem, events: CollisionEvents) -> None:
+        self.garbage = garbage
+        self.events = events
+
+        self.ids = array('q')
+        self.rows = array('d')
+        self.columns = array('d')
+        self.row_speeds = array('d')
+        self.column_speeds = array('d')
+        # number of ticks shot is alive, shots fly after the muzzle flash
+        self.ages = array('l')
+        self._fired: list[tuple[float, float, float, float]] = []
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self.rows) + len(self._fired)
+
+    def fire(
+            self,
+            row: int | float,
+            column: int | float,
+            row_speed: int | float = -0.3,
+            column_speed: int | float = 0,
+    ) -> None:
+        """Fire a shot, direction and speed can be specified."""
+
+        self._fired.append((row, column, row_speed, column_speed))
+
+    def fire_spread(
+            self,
+            row: int | float,
+            column: int | float,
+            shots: int,
+            row_speed: int | float = -0.3,
+            max_column_speed: int | float = 0.3,
+    ) -> None:
+        """Fire a fan of shots with column speeds evenly spread
+        from -max_column_speed to max_column_speed."""
+
+        if shots == 1:
+            self.fire(row, column, row_speed)
+            return
+
+        for index in range(shots):
+            column_speed = max_column_speed * (2 * index / (shots - 1) - 1)
+            self.fire(row, column, row_speed, column_speed)
+
+    async def animate(self, canvas: 'curses.window', camera: 'Camera') -> None:
+        while True:
+            self.step(canvas, camera)
+            await asyncio.sleep(0)
+
+    def step(self, canvas: 'curses.window', camera: 'Camera') -> None:
+        """Move flying shots, record hits of garbage, draw the rest."""
+
+        row_min, row_max, col_min, col_max = camera.get_view_borders()
+        ids, rows, columns, ages = self.ids, self.rows, self.columns, self.ages
+        row_speeds, column_speeds = self.row_speeds, self.column_speeds
+
+        alive = 0
+        for slot in range(len(rows)):
+            row, column, age = rows[slot], columns[slot], ages[slot]
+            row_speed, column_speed = row_speeds[slot], column_speeds[slot]
+
+            if age < FLYING:
+                camera.draw_frame(canvas, row, column, MUZZLE_FLASH_SYMBOLS[age])
+            else:
+                previous_row, previous_column = row, column
+                row, column = row + row_speed, column + column_speed
+                if age == FLYING:
+                    beep()
+
+                if abs(row_speed) > 1 or abs(column_speed) > 1:
+                    # the path may cross garbage before the view border
+                    obstacle, row, column = self._find_crossed_obstacle(
+                        (previous_row, previous_column), (row, column),
+                    )
+                    if obstacle is None and not (
+                        row_min < row < row_max and col_min < column < col_max
+                    ):
+                        continue
+                else:
+                    # a shot slower than a cell per tick has nothing to cross
+                    if not (row_min < row < row_max and col_min < column < col_max):
+                        continue
+                    obstacle = self.garbage.find_collision(round(row), round(column))
+
+                if obstacle is not None:
+                    self.garbage.hit(obstacle.uid)
+                    self.events.record(ids[slot], obstacle, row, column)
+                    continue
+
+                symbol = '-' if column_speed else '|'
+                camera.draw_frame(canvas, row, column, symbol)
+
+            ids[alive] = ids[slot]
+            rows[alive], columns[alive], ages[alive] = row, column, age + 1
+            row_speeds[alive], column_speeds[alive] = row_speed, column_speed
+            alive += 1
+
+        for values in (ids, rows, columns, row_speeds, column_speeds, ages):
+            del values[alive:]
+
+        for row, column, row_speed, column_speed in self._fired:
+            ids.append(self._next_id)
+            self._next_id += 1
+            rows.append(row)
+            columns.append(column)
+            row_speeds.append(row_speed)
+            column_speeds.append(column_speed)
+            ages.append(0)
+        self._fired.clear()
+
+    def _find_crossed_obstacle(
+            self, start: tuple[float, float], end: tuple[float, float],
+    ) -> tuple[Obstacle | None, float, float]:
+        """Return obstacle crossed by the segment and position where it
+        was entered. Return None and segment end if nothing is crossed."""
+
+        end_row, end_column = end
+        hit = self.garbage.find_segment_collision(start, end)
+        if hit is None:
+            return None, end_row, end_column
+
+        obstacle, entry = hit
+        start_row, start_column = start
+        return (
+            obstacle,
+            start_row + (end_row - start_row) * entry,
+            start_column + (end_column - start_column) * entry,
+        )
@@ -0,0 +1,92 @@
+import struct
+
+from controls import InputState
+
+RECORDING_MAGIC = b'SPGR'
+RECORDING_VERSION = 1
+# magic, version, seed of the game, canvas rows and columns
+RECORDING_HEADER = struct.Struct('<4sBQHH')
+
+
+def encode_controls(
+        rows_direction: int, columns_direction: int, space_pressed: bool,
+) -> int:
+    """Pack controls state of a tick into one byte."""
+    return (rows_direction + 1) | (columns_direction + 1) << 2 | space_pressed << 4
+
+
+def decode_controls(code: int) -> tuple[int, int, bool]:
+    return (code & 3) - 1, (code >> 2 & 3) - 1, bool(code & 16)
+
+
+class Recording:
+    """Seed, canvas size and controls state of every tick of a game.
+    Controls of a tick are packed into one byte, see `encode_controls`."""
+
+    def __init__(
+            self, seed: int, rows: int, columns: int, ticks: bytes = b'',
+    ) -> None:
+        self.seed = seed
+        self.rows = rows
+        self.columns = columns
+        self.ticks = bytearray(ticks)
+
+    def __len__(self) -> int:
+        return len(self.ticks)
+
+    def save(self, path: str) -> None:
+        header = RECORDING_HEADER.pack(
+            RECORDING_MAGIC, RECORDING_VERSION, self.seed, self.rows, self.columns,
+        )
+        with open(path, 'wb') as f:
+            f.write(header)
+            f.write(self.ticks)
+
+    @classmethod
+    def load(cls, path: str) -> 'Recording':
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        if len(data) < RECORDING_HEADER.size:
+            raise ValueError(f'{path} is not a game recording.')
+        magic, version, seed, rows, columns = RECORDING_HEADER.unpack_from(data)
+        if magic != RECORDING_MAGIC:
+            raise ValueError(f'{path} is not a game recording.')
+        if version != RECORDING_VERSION:
+            raise ValueError(
+                f'Recording version {version} of {path} is not supported. '
+                f'Expects {RECORDING_VERSION}.',
+            )
+        return cls(seed, rows, columns, data[RECORDING_HEADER.size:])
+
+
+class InputRecorder(InputState):
+    """Controls passing through state read from other controls
+    and saving it to recording, tick by tick."""
+
+    def __init__(self, controls: InputState, recording: Recording) -> None:
+        super().__init__()
+        self.controls = controls
+        self.recording = recording
+
+    def read(self) -> tuple[int, int, bool]:
+        controls = self.controls.read()
+        self.recording.ticks.append(encode_controls(*controls))
+        return controls
+
+
+class InputReplay(InputState):
+    """Controls feeding back recorded state tick by tick, no keys are read.
+    When the recording is over, nothing is pressed."""
+
+    def __init__(self, recording: Recording) -> None:
+        super().__init__()
+        self.recording = recording
+        self.tick = 0
+
+    def read(self) -> tuple[int, int, bool]:
+        if self.tick >= len(self.recording):
+            return 0, 0, False
+        code = self.recording.ticks[self.tick]
+        self.tick += 1
+        return decode_controls(code)
@@ -0,0 +1,95 @@
+import itertools
+import types
+from typing import Coroutine, Generator, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from profiler import Profiler
+
+TIMER_WHEEL_SIZE = 128
+
+
+@types.coroutine
+def sleep(counter: int = 1) -> Generator[int, None, None]:
+    """Suspend coroutine for `counter` ticks of the scheduler.
+    Does not suspend at all if counter is zero."""
+
+    if counter > 0:
+        yield counter
+
+
+class Scheduler:
+    """Tick scheduler for game coroutines based on a hashed timer wheel.
+
+    Coroutine yields number of ticks to wait — see `sleep` — and is parked
+    in a wheel slot of the tick it is due, so every tick resumes only
+    the coroutines due in that tick. Bare `await asyncio.sleep(0)` waits
+    for one tick. Coroutines due in the same tick are resumed in order
+    of spawning, just like a list of coroutines iterated every tick.
+
+    Spawning and retiring a coroutine are O(1). A coroutine spawned while
+    a tick is running — or between ticks — starts on the next tick.
+    `spawned` and `retired` count coroutines spawned and finished during
+    the last tick.
+
+    If `profiler` is set, wall time of every coroutine resume is recorded."""
+
+    def __init__(self, wheel_size: int = TIMER_WHEEL_SIZE) -> None:
+        self.tick = 0
+        self._wheel: list[list[tuple[int, int, Coroutine]]] = [
+            [] for _ in range(wheel_size)
+        ]
+        self._order = itertools.count()
+        self._live = 0
+        self.spawned = 0
+        self.retired = 0
+        self.profiler: 'Profiler | None' = None
+
+    def __len__(self) -> int:
+        return self._live
+
+    def spawn(self, coroutine: Coroutine) -> None:
+        """Start coroutine on the next tick."""
+
+        self._park(coroutine, self.tick + 1, next(self._order))
+        self._live += 1
+        self.spawned += 1
+
+    def run_tick(self) -> None:
+        """Resume every coroutine due in the next tick."""
+
+        self.tick += 1
+        self.spawned = self.retired = 0
+        profiler = self.profiler
+        for order, coroutine in self._pop_due():
+            try:
+                if profiler is None:
+                    delay = coroutine.send(None)
+                else:
+                    with profiler.measure_coroutine(coroutine):
+                        delay = coroutine.send(None)
+            except StopIteration:
+                self._live -= 1
+                self.retired += 1
+                continue
+            self._park(coroutine, self.tick + (delay or 1), order)
+
+    def _park(self, coroutine: Coroutine, due_tick: int, order: int) -> None:
+        slot = self._wheel[due_tick % len(self._wheel)]
+        slot.append((due_tick, order, coroutine))
+
+    def _pop_due(self) -> list[tuple[int, Coroutine]]:
+        slot_index = self.tick % len(self._wheel)
+        slot = self._wheel[slot_index]
+
+        due = []
+        waiting = []
+        for due_tick, order, coroutine in slot:
+            if due_tick == self.tick:
+                due.append((order, coroutine))
+            else:
+                # parked for more than one turn of the wheel
+                waiting.append((due_tick, order, coroutine))
+
+        self._wheel[slot_index] = waiting
+        due.sort(key=lambda item: item[0])
+        return due
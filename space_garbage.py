@@ -1,45 +1,333 @@
 import asyncio
-from typing import TYPE_CHECKING
+import math
+from array import array
+from collections import defaultdict
+from typing import Iterator, Sequence, TYPE_CHECKING
 
-from obstacles import Obstacle
-from utils import draw_frame, get_frame_size
-
-obstacles = []
-obstacles_in_last_collision: list[Obstacle] = []
+from constants import OFFSCREEN_UPDATE_PERIOD
+from obstacles import (
+    Obstacle,
+    get_segment_entry,
+    has_collision,
+    has_mask_collision,
+)
+from sprites import Frame, Sprite, get_sprite
 
 if TYPE_CHECKING:
     import curses
 
+    from camera import Camera
+
+STRIP_WIDTH = 8
+# mask of a solid object of one cell, the most common one — a shot
+POINT_MASKS = [1]
+
+
+class GarbageSystem:
+    """All flying garbage stored as struct of arrays.
+
+    Garbage flies from top to bottom of the world, column position stays
+    same as specified on start. Every tick all pieces are moved and retired
+    in one pass by a single coroutine, pieces in the camera view are drawn
+    in order they were added. Pieces out of the view are moved only every
+    OFFSCREEN_UPDATE_PERIOD ticks, by all the ticks they have skipped.
+
+    Garbage never changes column, so for collision queries pieces are indexed
+    by vertical strips of STRIP_WIDTH columns. Pieces whose bounding boxes
+    collide are then tested with row bitmasks of their sprites, so blank
+    corners and gaps of a sprite let objects through. Queries return
+    Obstacle views of pieces, with piece id as uid.
+
+    A hit piece is only flagged, see `hit`: it is skipped by collision
+    queries at once and retired on the next step."""
+
+    def __init__(self) -> None:
+        self.ids = array('q')
+        self.rows = array('d')
+        self.columns = array('l')
+        self.speeds = array('d')
+        self.rows_sizes = array('l')
+        self.columns_sizes = array('l')
+        self.sprite_ids = array('l')
+        # pieces added after the last step stay on their start row
+        self.fresh = array('b')
+        self.hits = array('b')
+        # ticks skipped by a piece out of the view since it was moved
+        self.lags = array('l')
+
+        self.sprites: list[Sprite] = []
+        self._sprite_ids: dict[Sprite, int] = {}
+        self._slots: dict[int, int] = {}
+        # ids of pieces in every strip, in order of adding
+        self._strips: defaultdict[int, list[int]] = defaultdict(list)
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[Obstacle]:
+        return (self.get_obstacle(slot) for slot in range(len(self)))
 
-async def fly_garbage(
-    canvas: 'curses.window',
-    column: int,
-    garbage_frame: str,
-    speed: int | float = 0.5,
-) -> None:
-    """Animate garbage, flying from top to bottom.
-    Column position will stay same, as specified on start."""
-    rows_number, columns_number = canvas.getmaxyx()
+    def add(
+            self, column: int, garbage_frame: Frame, speed: int | float = 0.5,
+    ) -> int:
+        """Add piece of garbage on top of the screen, return its id."""
 
-    column = max(column, 0)
-    column = min(column, columns_number - 1)
+        sprite = get_sprite(garbage_frame)
+        if sprite not in self._sprite_ids:
+            self._sprite_ids[sprite] = len(self.sprites)
+            self.sprites.append(sprite)
 
-    row: int | float = 0
+        piece_id = self._next_id
+        self._next_id += 1
 
-    rows_size, columns_size = get_frame_size(garbage_frame)
-    obstacle = Obstacle(round(row), column, rows_size, columns_size)
-    obstacles.append(obstacle)
+        self._slots[piece_id] = len(self.ids)
+        self.ids.append(piece_id)
+        self.rows.append(0)
+        self.columns.append(column)
+        self.speeds.append(speed)
+        self.rows_sizes.append(sprite.rows)
+        self.columns_sizes.append(sprite.columns)
+        self.sprite_ids.append(self._sprite_ids[sprite])
+        self.fresh.append(1)
+        self.hits.append(0)
+        self.lags.append(0)
 
-    try:
-        while row < rows_number:
-            if obstacle in obstacles_in_last_collision:
-                obstacles_in_last_collision.remove(obstacle)
-                break
+        for strip in self._get_strips(column, sprite.columns):
+            self._strips[strip].append(piece_id)
 
-            draw_frame(canvas, row, column, garbage_frame)
+        return piece_id
+
+    def get_obstacle(self, slot: int) -> Obstacle:
+        return Obstacle(
+            round(self.rows[slot]),
+            self.columns[slot],
+            self.rows_sizes[slot],
+            self.columns_sizes[slot],
+            uid=self.ids[slot],
+        )
+
+    def hit(self, piece_id: int) -> bool:
+        """Flag piece as hit, return False if it was hit already."""
+
+        slot = self._slots[piece_id]
+        if self.hits[slot]:
+            return False
+        self.hits[slot] = 1
+        return True
+
+    async def animate(self, canvas: 'curses.window', camera: 'Camera') -> None:
+        while True:
+            self.step(camera)
+            self.draw(canvas, camera)
             await asyncio.sleep(0)
-            draw_frame(canvas, row, column, garbage_frame, negative=True)
-            row += speed
-            obstacle.row = round(row)
-    finally:
-        obstacles.remove(obstacle)
+
+    def step(self, camera: 'Camera') -> None:
+        """Move pieces by their speed, retire pieces which were hit
+        or flew out of the world."""
+
+        rows_number = camera.world_rows
+        ids, rows, fresh, hits, lags = (
+            self.ids, self.rows, self.fresh, self.hits, self.lags,
+        )
+        columns, speeds = self.columns, self.speeds
+        rows_sizes, columns_sizes, sprite_ids = (
+            self.rows_sizes, self.columns_sizes, self.sprite_ids,
+        )
+
+        alive = 0
+        for slot in range(len(ids)):
+            row = rows[slot]
+            if fresh[slot]:
+                fresh[slot] = 0
+            else:
+                lag = lags[slot] + 1
+                if lag < OFFSCREEN_UPDATE_PERIOD and not camera.is_visible(
+                    row, columns[slot], rows_sizes[slot], columns_sizes[slot],
+                ):
+                    lags[slot] = lag
+                else:
+                    row += speeds[slot] * lag
+                    lags[slot] = 0
+
+            if row >= rows_number or hits[slot]:
+                self._retire(slot)
+                continue
+
+            if alive != slot:
+                ids[alive], fresh[alive] = ids[slot], fresh[slot]
+                hits[alive], lags[alive] = hits[slot], lags[slot]
+                columns[alive], speeds[alive] = columns[slot], speeds[slot]
+                rows_sizes[alive] = rows_sizes[slot]
+                columns_sizes[alive] = columns_sizes[slot]
+                sprite_ids[alive] = sprite_ids[slot]
+                self._slots[ids[alive]] = alive
+            rows[alive] = row
+            alive += 1
+
+        for values in (
+            ids, rows, columns, speeds, rows_sizes, columns_sizes, sprite_ids, fresh,
+            hits, lags,
+        ):
+            del values[alive:]
+
+    def draw(self, canvas: 'curses.window', camera: 'Camera') -> None:
+        """Draw pieces found in strips of the view, the rest is not touched."""
+
+        sprites, sprite_ids = self.sprites, self.sprite_ids
+        for piece_id in self._get_candidates(camera.column, camera.view_columns):
+            slot = self._slots[piece_id]
+            sprite = sprites[sprite_ids[slot]]
+            camera.draw_frame(canvas, self.rows[slot], self.columns[slot], sprite)
+
+    def find_collision(
+            self,
+            obj_corner_row: int,
+            obj_corner_column: int,
+            obj_size_rows: int = 1,
+            obj_size_columns: int = 1,
+            obj_masks: list[int] | None = None,
+    ) -> Obstacle | None:
+        """Return the first piece, in order of adding, colliding with object.
+        Return None if there is no collision.
+
+        Object without masks is solid, with masks — see Sprite.masks —
+        only its non-blank cells collide."""
+
+        for piece_id in self._get_candidates(obj_corner_column, obj_size_columns):
+            slot = self._slots[piece_id]
+            if not self.hits[slot] and self._has_collision(
+                slot,
+                obj_corner_row,
+                obj_corner_column,
+                obj_size_rows,
+                obj_size_columns,
+                obj_masks,
+            ):
+                return self.get_obstacle(slot)
+        return None
+
+    def _has_collision(
+            self,
+            slot: int,
+            corner_row: int,
+            corner_column: int,
+            size_rows: int,
+            size_columns: int,
+            masks: list[int] | None,
+    ) -> bool:
+        piece_row, piece_column = round(self.rows[slot]), self.columns[slot]
+        # bounding boxes are cheap to test and rule out most pieces
+        if not has_collision(
+            piece_row,
+            piece_column,
+            self.rows_sizes[slot],
+            self.columns_sizes[slot],
+            corner_row,
+            corner_column,
+            size_rows,
+            size_columns,
+        ):
+            return False
+
+        if masks is None:
+            if size_rows == size_columns == 1:
+                masks = POINT_MASKS
+            else:
+                masks = [(1 << size_columns) - 1] * size_rows
+        return has_mask_collision(
+            piece_row,
+            piece_column,
+            self.sprites[self.sprite_ids[slot]].masks,
+            corner_row,
+            corner_column,
+            masks,
+        )
+
+    def find_segment_collision(
+            self, start: tuple[float, float], end: tuple[float, float],
+    ) -> tuple[Obstacle, float] | None:
+        """Find the first piece crossed by a segment moving from start to end.
+        Return the piece and fraction of segment length where its non-blank
+        cell is hit, or None if segment crosses nothing."""
+
+        (start_row, start_column), (end_row, end_column) = start, end
+        first_column = math.floor(min(start_column, end_column))
+        last_column = math.ceil(max(start_column, end_column))
+
+        first_hit = None
+        for piece_id in self._get_candidates(
+            first_column, last_column - first_column + 1,
+        ):
+            slot = self._slots[piece_id]
+            if self.hits[slot]:
+                continue
+
+            entry = get_segment_entry(
+                (round(self.rows[slot]), self.columns[slot]),
+                (self.rows_sizes[slot], self.columns_sizes[slot]),
+                start,
+                end,
+            )
+            if entry is None or (first_hit is not None and entry >= first_hit[1]):
+                continue
+
+            hit = self._find_segment_hit(slot, start, end, entry)
+            if hit is not None and (first_hit is None or hit < first_hit[1]):
+                first_hit = self.get_obstacle(slot), hit
+
+        return first_hit
+
+    def _find_segment_hit(
+            self,
+            slot: int,
+            start: tuple[float, float],
+            end: tuple[float, float],
+            entry: float,
+    ) -> float | None:
+        """Walk the segment from the entry into the piece box by half a cell
+        up to its end, return fraction of segment length where a non-blank
+        cell is hit."""
+
+        (start_row, start_column), (end_row, end_column) = start, end
+        rows_delta, columns_delta = end_row - start_row, end_column - start_column
+        step = 0.5 / max(abs(rows_delta), abs(columns_delta), 0.5)
+
+        piece_row, piece_column = round(self.rows[slot]), self.columns[slot]
+        masks = self.sprites[self.sprite_ids[slot]].masks
+        for number in range(math.ceil((1 - entry) / step) + 1):
+            fraction = min(entry + number * step, 1.0)
+            row = round(start_row + rows_delta * fraction) - piece_row
+            column = round(start_column + columns_delta * fraction) - piece_column
+            if 0 <= row < len(masks) and column >= 0 and masks[row] >> column & 1:
+                return fraction
+        return None
+
+    def _get_candidates(self, column: int, columns_size: int) -> Sequence[int]:
+        """Return ids of pieces sharing strips with the columns, in order of adding.
+        Columns of a single strip get its own list, nothing is allocated."""
+
+        strips = self._get_strips(column, columns_size)
+        if len(strips) == 1:
+            return self._strips.get(strips[0], ())
+
+        candidates = set()
+        for strip in strips:
+            if strip in self._strips:
+                candidates.update(self._strips[strip])
+        return sorted(candidates)
+
+    def _retire(self, slot: int) -> None:
+        piece_id = self.ids[slot]
+        del self._slots[piece_id]
+        for strip in self._get_strips(self.columns[slot], self.columns_sizes[slot]):
+            strip_ids = self._strips[strip]
+            strip_ids.remove(piece_id)
+            if not strip_ids:
+                del self._strips[strip]
+
+    @staticmethod
+    def _get_strips(column: int, columns_size: int) -> range:
+        last_column = column + columns_size - 1
+        return range(column // STRIP_WIDTH, last_column // STRIP_WIDTH + 1)
+
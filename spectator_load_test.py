@@ -0,0 +1,169 @@
+"""Stream a headless game to many spectators over loopback and check
+every spectator ends up with the same screen as the game.
+
+Some spectators read slowly, so frames are dropped for them and
+they catch up with keyframes. A few connect and never read, the server
+must still close in time with their data unsent. Tick time of the game
+is measured to see that spectators don't stall it.
+
+Usage: python spectator_load_test.py --spectators 120 --ticks 300"""
+import argparse
+import asyncio
+import socket
+import statistics
+import sys
+import time
+
+from constants import TIC_TIMEOUT
+from controls import InputState
+from game import Game
+from headless import CellGrid, HeadlessCanvas, parse_size
+from spectators import SpectatorServer, apply_runs, read_frame
+
+# every SLOW_SPECTATORS-th spectator waits between reading frames
+SLOW_SPECTATORS = 10
+SLOW_READ_DELAY = 0.05
+# small receive buffer of slow spectators makes the server queue their data
+SLOW_RECEIVE_BUFFER = 4096
+# spectators connected without ever reading
+STALLED_SPECTATORS = 3
+CLOSE_TIMEOUT = 3
+
+
+async def connect_stalled(host: str, port: int) -> socket.socket:
+    """Connect a spectator which never reads."""
+
+    sock = socket.socket()
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SLOW_RECEIVE_BUFFER)
+    sock.setblocking(False)
+    await asyncio.get_running_loop().sock_connect(sock, (host, port))
+    return sock
+
+
+class Spectator:
+    """Loopback client applying received frames to its own grid."""
+
+    def __init__(self, rows: int, columns: int, read_delay: float = 0) -> None:
+        self.grid = CellGrid(rows, columns)
+        self.read_delay = read_delay
+        self.tick = -1
+        self.frames = 0
+        self.keyframes = 0
+
+    async def watch(self, host: str, port: int) -> None:
+        sock = socket.socket()
+        if self.read_delay:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SLOW_RECEIVE_BUFFER)
+        sock.setblocking(False)
+        await asyncio.get_running_loop().sock_connect(sock, (host, port))
+        reader, writer = await asyncio.open_connection(sock=sock)
+        try:
+            while True:
+                kind, self.tick, _, _, runs = await read_frame(reader)
+                apply_runs(self.grid, runs)
+                self.frames += 1
+                self.keyframes += kind == b'K'
+                if self.read_delay:
+                    await asyncio.sleep(self.read_delay)
+        except asyncio.IncompleteReadError:
+            pass
+        finally:
+            writer.close()
+
+
+async def run_load_test(
+        spectators_number: int, ticks: int, rows: int, columns: int,
+) -> bool:
+    game = Game(seed=0)
+    canvas = HeadlessCanvas(rows, columns)
+    compositor = game.start(canvas, InputState(source=canvas))
+    compositor.background.border()
+
+    spectator_server = SpectatorServer(compositor)
+    server = await spectator_server.start('127.0.0.1', 0)
+    host, port = server.sockets[0].getsockname()[:2]
+
+    spectators = [
+        Spectator(
+            rows, columns, SLOW_READ_DELAY if number % SLOW_SPECTATORS == 0 else 0,
+        )
+        for number in range(spectators_number)
+    ]
+    tasks = [asyncio.create_task(spectator.watch(host, port)) for spectator in spectators]
+    stalled_sockets = [
+        await connect_stalled(host, port) for _ in range(STALLED_SPECTATORS)
+    ]
+    stalled_ports = {sock.getsockname()[1] for sock in stalled_sockets}
+    while len(spectator_server.clients) < spectators_number + STALLED_SPECTATORS:
+        await asyncio.sleep(0.01)
+
+    tick_times = []
+    for _ in range(ticks):
+        started_at = time.perf_counter()
+        game.scheduler.run_tick()
+        compositor.flush()
+        spectator_server.broadcast()
+        tick_times.append(time.perf_counter() - started_at)
+        # let spectators read, like the game loop does while sleeping
+        await asyncio.sleep(0.001)
+
+    # keep sending empty frames until every spectator has seen the last tick
+    # and no one reading waits for a keyframe
+    last_tick = spectator_server.tick
+    while (
+        any(spectator.tick < last_tick for spectator in spectators)
+        or any(
+            behind
+            for client, behind in spectator_server.clients.items()
+            if client.get_extra_info('peername')[1] not in stalled_ports
+        )
+    ):
+        await asyncio.sleep(TIC_TIMEOUT)
+        spectator_server.broadcast()
+
+    unsent = sum(
+        client.transport.get_write_buffer_size()
+        for client in spectator_server.clients
+        if client.get_extra_info('peername')[1] in stalled_ports
+    )
+    started_at = time.perf_counter()
+    try:
+        await asyncio.wait_for(spectator_server.close(), CLOSE_TIMEOUT)
+        close_time = time.perf_counter() - started_at
+    except TimeoutError:
+        close_time = None
+    await asyncio.gather(*tasks)
+    for sock in stalled_sockets:
+        sock.close()
+
+    screen = compositor.front.get_lines()
+    matching = sum(spectator.grid.get_lines() == screen for spectator in spectators)
+    print(f'spectators:     {spectators_number}')
+    print(f'matching:       {matching}')
+    print(f'ticks:          {ticks}')
+    print(f'p50 tick:       {statistics.median(tick_times) * 1000:.3f} ms')
+    print(f'max tick:       {max(tick_times) * 1000:.3f} ms')
+    print(f'sent frames:    {spectator_server.sent_frames}')
+    print(f'dropped frames: {spectator_server.dropped_frames}')
+    print(f'keyframes:      {sum(spectator.keyframes for spectator in spectators)}')
+    print(f'sent bytes:     {spectator_server.sent_bytes}')
+    print(f'stalled:        {STALLED_SPECTATORS}, {unsent} bytes unsent')
+    if close_time is None:
+        print(f'close:          not done in {CLOSE_TIMEOUT} s')
+    else:
+        print(f'close:          {close_time * 1000:.3f} ms')
+    return matching == spectators_number and close_time is not None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Spectator server load test.')
+    parser.add_argument('--spectators', type=int, default=120)
+    parser.add_argument('--ticks', type=int, default=300)
+    parser.add_argument('--size', type=parse_size, default='50x200')
+    args = parser.parse_args()
+
+    rows, columns = args.size
+    if not asyncio.run(run_load_test(args.spectators, args.ticks, rows, columns)):
+        print('FAIL: spectators see a different screen or the server hangs')
+        sys.exit(1)
+    print('OK')
@@ -0,0 +1,231 @@
+import asyncio
+import socket
+import struct
+from array import array
+from itertools import groupby
+from typing import Iterable
+
+from compositor import Compositor
+from headless import CellGrid
+
+KEYFRAME, DELTA = b'K', b'D'
+# size of the rest of the message, kind, tick, rows, columns, number of runs
+MESSAGE_HEADER = struct.Struct('<IcIHHI')
+# index of the first cell, number of cells, attribute, code point of symbol
+RUN = struct.Struct('<IHII')
+MAX_RUN_LENGTH = 0xFFFF
+# bytes waiting to be sent to a client above which it gets no new frames
+MAX_CLIENT_BUFFER = 16 * 1024
+# kernel send buffer of a client, kept small so a slow client can't
+# fall far behind before its frames are dropped
+CLIENT_SEND_BUFFER = 16 * 1024
+
+Run = tuple[int, int, int, str]
+
+
+def parse_address(address: str) -> tuple[str, int]:
+    """Parse address given as HOST:PORT, e.g. 127.0.0.1:8765."""
+
+    host, _, port = address.rpartition(':')
+    try:
+        return host or '127.0.0.1', int(port)
+    except ValueError:
+        raise ValueError(f'Wrong address {address!r}. Expects HOST:PORT.')
+
+
+def get_text_runs(start: int, text: str, attr: int) -> list[Run]:
+    """Split text starting at cell index into runs of the same symbol,
+    as (start, length, attr, symbol)."""
+
+    runs = []
+    for symbol, symbols in groupby(text):
+        length = len(list(symbols))
+        while length:
+            run_length = min(length, MAX_RUN_LENGTH)
+            runs.append((start, run_length, attr, symbol))
+            start += run_length
+            length -= run_length
+    return runs
+
+
+def get_grid_runs(grid: CellGrid) -> list[Run]:
+    """Encode every cell of the grid as runs of the same symbol and attribute."""
+
+    runs = []
+    start = 0
+    for (symbol, attr), cells in groupby(zip(grid.chars, grid.attrs)):
+        length = len(list(cells))
+        runs.extend(get_text_runs(start, symbol * length, attr))
+        start += length
+    return runs
+
+
+def encode_frame(
+        kind: bytes, tick: int, rows: int, columns: int, runs: Iterable[Run],
+) -> bytes:
+    body = bytearray()
+    runs_number = 0
+    for start, length, attr, symbol in runs:
+        body += RUN.pack(start, length, attr, ord(symbol))
+        runs_number += 1
+
+    header = MESSAGE_HEADER.pack(
+        MESSAGE_HEADER.size - 4 + len(body), kind, tick, rows, columns, runs_number,
+    )
+    return header + body
+
+
+async def read_frame(
+        reader: asyncio.StreamReader,
+) -> tuple[bytes, int, int, int, list[Run]]:
+    """Read next frame sent by the server, return
+    (kind, tick, rows, columns, runs). Raise IncompleteReadError
+    when the server closes connection."""
+
+    size_data = await reader.readexactly(4)
+    data = size_data + await reader.readexactly(int.from_bytes(size_data, 'little'))
+    _, kind, tick, rows, columns, runs_number = MESSAGE_HEADER.unpack_from(data)
+    runs = [
+        (start, length, attr, chr(code_point))
+        for start, length, attr, code_point in RUN.iter_unpack(
+            data[MESSAGE_HEADER.size:MESSAGE_HEADER.size + runs_number * RUN.size],
+        )
+    ]
+    return kind, tick, rows, columns, runs
+
+
+def apply_runs(grid: CellGrid, runs: Iterable[Run]) -> None:
+    """Write runs of a frame to the grid of the same size."""
+
+    for start, length, attr, symbol in runs:
+        grid.chars[start:start + length] = [symbol] * length
+        grid.attrs[start:start + length] = array('L', [attr]) * length
+
+
+class SpectatorServer:
+    """TCP server streaming frames rendered by the compositor to spectators.
+
+    A client gets a keyframe — the whole screen — on connect, then
+    the cells changed by every rendered frame, as runs of the same symbol.
+    A delta is encoded once and sent to every client as is.
+
+    Sending never waits for clients. Frames for a client whose unsent
+    data is above max_client_buffer are dropped, when the client catches
+    up it gets a keyframe instead of the missed deltas.
+
+    Counters:
+        sent_frames — frames queued for sending to clients
+        dropped_frames — frames not sent to slow clients
+        sent_bytes — bytes queued for sending to clients"""
+
+    def __init__(
+            self, compositor: Compositor, max_client_buffer: int = MAX_CLIENT_BUFFER,
+    ) -> None:
+        self.compositor = compositor
+        self.max_client_buffer = max_client_buffer
+        compositor.spans = []
+
+        self.server: asyncio.Server | None = None
+        self.tick = 0
+        # client -> whether it missed frames and waits for a keyframe
+        self.clients: dict[asyncio.StreamWriter, bool] = {}
+        self._handlers: set[asyncio.Task] = set()
+        self.sent_frames = 0
+        self.dropped_frames = 0
+        self.sent_bytes = 0
+
+    async def start(self, host: str, port: int) -> asyncio.Server:
+        self.server = await asyncio.start_server(self._serve_client, host, port)
+        return self.server
+
+    async def close(self) -> None:
+        """Stop accepting spectators and disconnect the connected ones.
+
+        A client that stopped reading would never take its unsent data,
+        so its connection is aborted instead of closed gracefully."""
+
+        if self.server is not None:
+            self.server.close()
+        for client in list(self.clients):
+            if client.transport.get_write_buffer_size():
+                client.transport.abort()
+            else:
+                client.close()
+        # let client handlers see the end of their connections
+        await asyncio.gather(*self._handlers)
+        if self.server is not None:
+            await self.server.wait_closed()
+
+    def broadcast(self) -> None:
+        """Send the frame rendered last to every client.
+        Called after every render of the compositor."""
+
+        self.tick += 1
+        delta = keyframe = None
+        for client, behind in self.clients.items():
+            if client.is_closing():
+                continue
+
+            if client.transport.get_write_buffer_size() > self.max_client_buffer:
+                self.clients[client] = True
+                self.dropped_frames += 1
+                continue
+
+            if behind:
+                keyframe = keyframe or self._encode_keyframe()
+                frame = keyframe
+                self.clients[client] = False
+            else:
+                delta = delta or encode_frame(
+                    DELTA,
+                    self.tick,
+                    self.compositor.rows,
+                    self.compositor.columns,
+                    (
+                        run
+                        for start, text, attr in self.compositor.spans
+                        for run in get_text_runs(start, text, attr)
+                    ),
+                )
+                frame = delta
+
+            client.write(frame)
+            self.sent_frames += 1
+            self.sent_bytes += len(frame)
+
+        self.compositor.spans.clear()
+
+    def _encode_keyframe(self) -> bytes:
+        compositor = self.compositor
+        return encode_frame(
+            KEYFRAME,
+            self.tick,
+            compositor.rows,
+            compositor.columns,
+            get_grid_runs(compositor.front),
+        )
+
+    async def _serve_client(
+            self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+    ) -> None:
+        client_socket = writer.get_extra_info('socket')
+        client_socket.setsockopt(
+            socket.SOL_SOCKET, socket.SO_SNDBUF, CLIENT_SEND_BUFFER,
+        )
+
+        keyframe = self._encode_keyframe()
+        writer.write(keyframe)
+        self.sent_frames += 1
+        self.sent_bytes += len(keyframe)
+        self.clients[writer] = False
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        try:
+            # spectators send nothing, wait until they disconnect
+            await reader.read()
+        except ConnectionError:
+            pass
+        finally:
+            del self.clients[writer]
+            self._handlers.discard(handler)
+            writer.close()
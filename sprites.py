@@ -0,0 +1,80 @@
+import re
+from functools import lru_cache
+
+
+class Sprite:
+    """Multiline text fragment parsed once for drawing.
+
+    Keeps frame size, the list of non-blank cells as
+    (row offset, column offset, symbol) in drawing order and the same cells
+    joined into spans — maximal runs of non-blank symbols in a row —
+    as (row offset, column offset, text).
+
+    For collision tests every row is also kept as a bitmask of its
+    non-blank cells, bit N standing for column offset N."""
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+        lines = text.splitlines()
+        self.rows = len(lines)
+        self.columns = max([len(line) for line in lines], default=0)
+        self.cells = [
+            (row, column, symbol)
+            for row, line in enumerate(lines)
+            for column, symbol in enumerate(line)
+            if symbol != ' '
+        ]
+        self.spans = [
+            (row, match.start(), match.group())
+            for row, line in enumerate(lines)
+            for match in re.finditer(r'[^ ]+', line)
+        ]
+        self.masks = get_row_masks(self.rows, self.cells)
+
+    @classmethod
+    def from_parts(
+            cls,
+            text: str,
+            rows: int,
+            columns: int,
+            cells: list[tuple[int, int, str]],
+            spans: list[tuple[int, int, str]],
+    ) -> 'Sprite':
+        """Create sprite from precomputed size, cells and spans,
+        without parsing the text again."""
+
+        sprite = cls.__new__(cls)
+        sprite.text = text
+        sprite.rows, sprite.columns = rows, columns
+        sprite.cells, sprite.spans = cells, spans
+        sprite.masks = get_row_masks(rows, cells)
+        return sprite
+
+    def __repr__(self) -> str:
+        return f'Sprite(rows={self.rows}, columns={self.columns})'
+
+
+Frame = str | Sprite
+
+
+def get_row_masks(rows: int, cells: list[tuple[int, int, str]]) -> list[int]:
+    """Return bitmask of non-blank cells for every row."""
+
+    masks = [0] * rows
+    for row, column, _ in cells:
+        masks[row] |= 1 << column
+    return masks
+
+
+@lru_cache(maxsize=1024)
+def _compile_sprite(text: str) -> Sprite:
+    return Sprite(text)
+
+
+def get_sprite(frame: Frame) -> Sprite:
+    """Return sprite for a frame, raw text frames are compiled once and cached."""
+
+    if isinstance(frame, Sprite):
+        return frame
+    return _compile_sprite(frame)
@@ -0,0 +1,171 @@
+import curses
+from array import array
+
+from constants import TIC_TIMEOUT
+from scheduler import sleep
+
+BLINKING_PARAMS = [
+    (round(2 / TIC_TIMEOUT), curses.A_DIM),
+    (round(0.3 / TIC_TIMEOUT), curses.A_NORMAL),
+    (round(0.5 / TIC_TIMEOUT), curses.A_BOLD),
+    (round(0.3 / TIC_TIMEOUT), curses.A_NORMAL),
+]
+
+
+class Starfield:
+    """All blinking stars of the sky animated by a single coroutine.
+
+    Star positions, symbols, blink delays and current attributes are kept
+    in parallel columns — a list of symbols and arrays for the rest. Every
+    star goes through the BLINKING_PARAMS cycle after its initial delay,
+    so stars are grouped by the delay modulo cycle length: a tick touches
+    only the groups having a phase change in it and writes only stars whose
+    attribute changes.
+
+    Sky can be thinned to every `stride`-th star, hidden stars are erased
+    and not animated. Shown again, they are drawn in the current phase
+    of their group."""
+
+    def __init__(
+            self,
+            canvas: curses.window,
+            blinking_params: list[tuple[int, int]] = BLINKING_PARAMS,
+    ) -> None:
+        self.canvas = canvas
+        max_row, max_column = canvas.getmaxyx()
+        self.lower_right_corner = max_row - 1, max_column - 1
+
+        self.rows = array('l')
+        self.columns = array('l')
+        self.symbols: list[str] = []
+        self.delays = array('l')
+        self.attrs = array('L')
+
+        self.cycle_length = sum(timeout for timeout, _ in blinking_params)
+        self.initial_attr = blinking_params[0][1]
+
+        # tick of the cycle when attribute changes, and the new attribute
+        self.phase_changes = []
+        phase_start = 0
+        for timeout, attr in blinking_params:
+            self.phase_changes.append((phase_start, attr))
+            phase_start += timeout
+
+        self._groups = [array('l') for _ in range(self.cycle_length)]
+        # groups of stars shown with the current stride
+        self._visible_groups = self._groups
+        self.stride = 1
+        # tick of the last step, stars haven't blinked before the first one
+        self.tick = -1
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def add_star(
+            self, row: int, column: int, symbol: str, initial_blink_delay: int,
+    ) -> None:
+        # Curses can't write the lower right corner of the window
+        if (row, column) == self.lower_right_corner:
+            return
+
+        index = len(self.rows)
+        self.rows.append(row)
+        self.columns.append(column)
+        self.symbols.append(symbol)
+        self.delays.append(initial_blink_delay)
+        self.attrs.append(self.initial_attr)
+        group = initial_blink_delay % self.cycle_length
+        self._groups[group].append(index)
+        if self.stride != 1 and index % self.stride == 0:
+            self._visible_groups[group].append(index)
+
+    async def animate(self) -> None:
+        for index in range(0, len(self), self.stride):
+            self._draw_star(index)
+
+        tick = 0
+        while True:
+            self.step(tick)
+            await sleep()
+            tick += 1
+
+    def step(self, tick: int) -> None:
+        """Draw stars whose attribute changes at the tick of the animation."""
+
+        self.tick = tick
+        changes = []
+        for phase_start, attr in self.phase_changes:
+            phase_tick = tick - phase_start
+            for index in self._visible_groups[phase_tick % self.cycle_length]:
+                if phase_tick >= self.delays[index]:
+                    changes.append((index, attr))
+
+        # stars sharing a cell are drawn in order they were added
+        changes.sort()
+        for index, attr in changes:
+            self.attrs[index] = attr
+            self._draw_star(index)
+
+    def set_stride(self, stride: int) -> None:
+        """Show only every stride-th star, erase the rest.
+
+        A cell shared by several stars shows the visible one an unthrottled
+        sky would show there — the last drawn, at its latest phase change —
+        and is blanked only if no visible star is left in it."""
+
+        if stride == self.stride:
+            return
+
+        # the topmost visible star of every cell: drawn last, stars drawn
+        # on the same tick are drawn in order they were added
+        visible_stars = {}
+        drawn_at = {}
+        for index in range(0, len(self), stride):
+            cell = self.rows[index], self.columns[index]
+            _, draw_tick = self._get_blink(index)
+            if draw_tick >= drawn_at.get(cell, draw_tick):
+                visible_stars[cell], drawn_at[cell] = index, draw_tick
+
+        changed_cells = set()
+        for index in range(len(self)):
+            was_visible, visible = index % self.stride == 0, index % stride == 0
+            if was_visible != visible:
+                changed_cells.add((self.rows[index], self.columns[index]))
+            if visible and not was_visible:
+                self.attrs[index], _ = self._get_blink(index)
+
+        for row, column in changed_cells:
+            index = visible_stars.get((row, column))
+            if index is None:
+                self.canvas.addstr(row, column, ' ')
+            else:
+                self._draw_star(index)
+
+        self.stride = stride
+        if stride == 1:
+            self._visible_groups = self._groups
+        else:
+            self._visible_groups = [
+                array('l', [index for index in group if index % stride == 0])
+                for group in self._groups
+            ]
+
+    def _get_blink(self, index: int) -> tuple[int, int]:
+        """Return attribute of the star at the last step of the animation
+        and the tick of its last phase change, -1 before the first one."""
+
+        blink_tick = self.tick - self.delays[index]
+        if blink_tick < 0:
+            return self.initial_attr, -1
+
+        cycle_tick = blink_tick % self.cycle_length
+        attr, phase_start = self.initial_attr, 0
+        for start, phase_attr in self.phase_changes:
+            if start > cycle_tick:
+                break
+            attr, phase_start = phase_attr, start
+        return attr, self.tick - cycle_tick + phase_start
+
+    def _draw_star(self, index: int) -> None:
+        row, column = self.rows[index], self.columns[index]
+        self.canvas.addstr(row, column, self.symbols[index], self.attrs[index])
@@ -1,23 +1,22 @@
 import curses
+from contextlib import suppress
 
-from constants import (
-    UP_KEY_CODE,
-    DOWN_KEY_CODE,
-    RIGHT_KEY_CODE,
-    LEFT_KEY_CODE,
-    SPACE_KEY_CODE,
-    BORDER_OFFSET,
-)
+from constants import BORDER_OFFSET
+from sprites import Frame, get_sprite
 
 
-def get_frame_size(text: str) -> tuple[int, int]:
-    """Calculate size of multiline text fragment,
+def get_frame_size(frame: Frame) -> tuple[int, int]:
+    """Calculate size of multiline text fragment or sprite,
     return pair — number of rows and columns."""
 
-    lines = text.splitlines()
-    rows = len(lines)
-    columns = max([len(line) for line in lines])
-    return rows, columns
+    sprite = get_sprite(frame)
+    return sprite.rows, sprite.columns
+
+
+def beep() -> None:
+    """Beep if the terminal is initialized, stay silent in headless runs."""
+    with suppress(curses.error):
+        curses.beep()
 
 
 def get_canvas_borders(canvas: curses.window) -> tuple[int, int, int, int]:
@@ -27,71 +26,41 @@ def get_canvas_borders(canvas: curses.window) -> tuple[int, int, int, int]:
     return BORDER_OFFSET, rows - BORDER_OFFSET, BORDER_OFFSET, cols - BORDER_OFFSET
 
 
-def read_controls(canvas: curses.window) -> tuple[int, int, bool]:
-    """Read keys pressed and returns tuple with controls state."""
-
-    rows_direction = columns_direction = 0
-    space_pressed = False
-
-    while True:
-        pressed_key_code = canvas.getch()
-
-        if pressed_key_code == -1:
-            # https://docs.python.org/3/library/curses.html#curses.window.getch
-            break
-
-        if pressed_key_code == UP_KEY_CODE:
-            rows_direction = -1
-
-        if pressed_key_code == DOWN_KEY_CODE:
-            rows_direction = 1
-
-        if pressed_key_code == RIGHT_KEY_CODE:
-            columns_direction = 1
-
-        if pressed_key_code == LEFT_KEY_CODE:
-            columns_direction = -1
-
-        if pressed_key_code == SPACE_KEY_CODE:
-            space_pressed = True
-
-    return rows_direction, columns_direction, space_pressed
-
-
 def draw_frame(
     canvas: curses.window,
     start_row: int | float,
     start_column: int | float,
-    text: str,
+    frame: Frame,
     negative: bool = False,
 ) -> None:
-    """Draw multiline text fragment on canvas,
-    erase text instead of drawing if negative=True is specified."""
+    """Draw multiline text fragment or sprite on canvas,
+    erase it instead of drawing if negative=True is specified."""
 
     rows_number, columns_number = canvas.getmaxyx()
+    start_row, start_column = round(start_row), round(start_column)
 
-    for row, line in enumerate(text.splitlines(), round(start_row)):
-        if row < 0:
+    # Every span of non-blank symbols is written with one call,
+    # spaces between spans stay transparent
+    for row_offset, column_offset, text in get_sprite(frame).spans:
+        row = start_row + row_offset
+        if not 0 <= row < rows_number:
             continue
 
-        if row >= rows_number:
-            break
-
-        for column, symbol in enumerate(line, round(start_column)):
-            if column < 0:
-                continue
-
-            if column >= columns_number:
-                break
+        column = start_column + column_offset
+        if column >= columns_number:
+            continue
+        if column < 0:
+            text, column = text[-column:], 0
+        text = text[:columns_number - column]
 
-            if symbol == ' ':
-                continue
+        # Check that span does not end in a lower right corner of the window
+        # Curses will raise exception in that case. Don`t ask why...
+        # https://docs.python.org/3/library/curses.html#curses.window.addch
+        if row == rows_number - 1 and column + len(text) == columns_number:
+            text = text[:-1]
 
-            # Check that current position is not in a lower right corner of the window
-            # Curses will raise exception in that case. Don`t ask why...
-            # https://docs.python.org/3/library/curses.html#curses.window.addch
-            if row == rows_number - 1 and column == columns_number - 1:
-                continue
+        if not text:
+            continue
 
-            symbol = symbol if not negative else ' '
-            canvas.addch(row, column, symbol)
+        text = text if not negative else ' ' * len(text)
+        canvas.addstr(row, column, text)
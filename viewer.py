@@ -0,0 +1,53 @@
+"""Watch a game served with main.py --serve.
+
+Usage: python viewer.py HOST:PORT"""
+import argparse
+import asyncio
+import curses
+from contextlib import suppress
+
+from spectators import Run, parse_address, read_frame
+
+
+def draw_runs(screen: curses.window, columns: int, runs: list[Run]) -> None:
+    """Draw runs of a frame with `columns` columns, clipped by the screen."""
+
+    for start, length, attr, symbol in runs:
+        row, column = divmod(start, columns)
+        while length:
+            row_length = min(length, columns - column)
+            # the game screen may be larger than the viewer terminal
+            with suppress(curses.error):
+                screen.addstr(row, column, symbol * row_length, attr)
+            length -= row_length
+            row, column = row + 1, 0
+
+
+async def watch(screen: curses.window, host: str, port: int) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while True:
+            _, _, _, columns, runs = await read_frame(reader)
+            draw_runs(screen, columns, runs)
+            screen.refresh()
+    except asyncio.IncompleteReadError:
+        # the game is over
+        pass
+    finally:
+        writer.close()
+
+
+def view(screen: curses.window, host: str, port: int) -> None:
+    curses.curs_set(False)
+    screen.clear()
+    asyncio.run(watch(screen, host, port))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Watch a game served by main.py.')
+    parser.add_argument('address', type=parse_address, help='game address HOST:PORT')
+    args = parser.parse_args()
+
+    host, port = args.address
+    with suppress(KeyboardInterrupt):
+        curses.wrapper(view, host, port)